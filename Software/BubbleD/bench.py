@@ -0,0 +1,272 @@
+"""
+Author: Divya Pal
+Institute: Physikalisches Institut, Universität Bonn
+Modified: Oct 2026
+Purpose: Benchmarks loading, scaling, painting and navigating slides without
+displays (Qt offscreen platform), using a synthetic film of 4K images. The
+results are written as json and can be compared with an earlier run to find
+regressions between versions.
+"""
+
+import os
+import sys
+import json
+import time
+import shutil
+import platform
+import argparse
+import tempfile
+import subprocess
+import numpy as np
+
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+from PyQt5.QtCore import QRectF, QT_VERSION_STR  # noqa: E402
+from PyQt5.QtGui import QImage, QPainter, QPen, QColor  # noqa: E402
+from PyQt5.QtWidgets import QApplication  # noqa: E402
+
+FILM_TYPES = ('Default', 'Edited')
+N_VIEWS = 3
+IMG_SIZE = (3840, 2160)
+
+
+def make_slide(path, seed):
+    """Writes a synthetic bubble chamber picture: noise and curled tracks"""
+    rng = np.random.default_rng(seed)
+    w, h = IMG_SIZE
+    noise = rng.integers(0, 40, (h, w), dtype=np.uint8)
+    img = QImage(noise.data, w, h, w, QImage.Format_Grayscale8)
+    img = img.convertToFormat(QImage.Format_RGB32)
+    qp = QPainter(img)
+    qp.setRenderHint(QPainter.Antialiasing)
+    for _ in range(60):
+        qp.setPen(QPen(QColor(230, 230, 230), int(rng.integers(2, 6))))
+        r = float(rng.uniform(100, 3000))
+        x, y = rng.uniform(-r, w), rng.uniform(-r, h)
+        qp.drawArc(QRectF(x, y, 2*r, 2*r), int(rng.integers(0, 5760)),
+                   int(rng.integers(300, 2000)))
+    qp.end()
+    img.convertToFormat(QImage.Format_Grayscale8).save(path)
+
+
+def make_film(film_folder, n_slides, first=2411):
+    """Film folder with all film types and views, reused if complete"""
+    for t, FilmType in enumerate(FILM_TYPES):
+        for view in range(1, N_VIEWS+1):
+            view_dir = os.path.join(film_folder, FilmType, f'view_{view}')
+            os.makedirs(view_dir, exist_ok=True)
+            for n in range(first, first + n_slides):
+                path = os.path.join(view_dir, f'{n}.png')
+                if not os.path.isfile(path):
+                    make_slide(path, (t, view, n))
+    return [first + n for n in range(n_slides)]
+
+
+def bench_config(work_dir, film_folder):
+    """Default configuration of table 1 with the synthetic film"""
+    import packages.config_table1 as cfg
+    config = cfg.write_config(os.path.join(work_dir, 'config_table1.ini'))
+    config['Paths']['images'] = film_folder
+    config['Paths']['prescaled'] = os.path.join(work_dir, 'prescaled')
+    config['GUIParamters']['async_loading'] = 'False'
+    return config
+
+
+def timed(fn, repeat):
+    """Runs fn repeat times, returns the times in ms"""
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        times.append((time.perf_counter() - start)*1000)
+    return times
+
+
+def summary(times):
+    return {'median_ms': round(float(np.median(times)), 3),
+            'min_ms': round(float(np.min(times)), 3),
+            'mean_ms': round(float(np.mean(times)), 3),
+            'n': len(times)}
+
+
+def bench_image_window(config, film_folder, slides, repeat):
+    """selectImage (decoding and from the cache) and paintEvent"""
+    from packages.image_window import ImageWindow
+    ctrl = config['GUIParamters']
+    proj_dim = list(map(int, ctrl['proj_display'].split('x')))
+    table = dict(tx=0, ty=int(ctrl['table_start']), tw=proj_dim[0],
+                 th=int(ctrl['table_stop']), scale=float(ctrl['image_scale']))
+    win = ImageWindow(config['Paths']['icon'], prefetch_workers=1)
+    win.resize(*proj_dim)
+    win.show()
+    QApplication.processEvents()
+    dx, dy = np.array([0, 60, 60]), np.array([0, 0, 0])
+    results = {}
+    for n_view in range(1, N_VIEWS+1):
+        View = np.array([1]*n_view + [0]*(N_VIEWS - n_view))
+
+        def select(ImageNo=slides[0]):
+            win.selectImage(img_folder=film_folder, View=View,
+                            ImageNo=ImageNo, dx=dx, dy=dy, **table)
+
+        def select_cold():
+            win.cache.clear()
+            select()
+        results[f'select_decode_{n_view}view'] = summary(
+            timed(select_cold, repeat))
+        results[f'select_cached_{n_view}view'] = summary(
+            timed(select, repeat*10))
+        results[f'paint_{n_view}view'] = summary(
+            timed(win.repaint, repeat*10))
+    win.shutdown()
+    win.close()
+    return results
+
+
+def bench_gui(config, slides, repeat):
+    """Slide stepping, film type switching and displacement in the gui"""
+    from packages.gui_control import GUIcontrol
+    gui = GUIcontrol(config)
+    gui.im_win.resize(*gui.proj_dim)
+    gui.im_win.show()
+    QApplication.processEvents()
+    gui.btn_PV[0].click()
+    results = {}
+
+    # Stepping forward through the film, prefetching the next slides
+    gui.sbx_SlideNumber.setValue(0)
+    steps = []
+    for _ in range(repeat):
+        for i in range(1, len(slides)):
+            start = time.perf_counter()
+            gui.sbx_SlideNumber.setValue(i)
+            steps.append((time.perf_counter() - start)*1000)
+        gui.im_win.cache.clear()
+        gui.sbx_SlideNumber.setValue(0)
+    results['step_slide'] = summary(steps)
+
+    # Switching between the film types of the same slide
+    switches = []
+    for i in range(repeat*2):
+        gui.im_win.cache.clear()
+        start = time.perf_counter()
+        gui.cbx_FilmType.setCurrentIndex((i + 1) % len(FILM_TYPES))
+        gui.set_img_type()
+        switches.append((time.perf_counter() - start)*1000)
+    results['switch_film_type'] = summary(switches)
+
+    # Moving a view, including the paint of the moved area
+    def move():
+        gui.sbx_x[0].setValue(gui.sbx_x[0].value() + 1)
+        scheduler = gui.im_win.scheduler
+        if scheduler.timer.isActive():
+            scheduler.timer.stop()
+            scheduler.render()
+    results['displacement'] = summary(timed(move, repeat*20))
+    gui.im_win.shutdown()
+    gui.im_win.close()
+    gui.close()
+    return results
+
+
+def version():
+    """Git commit of the benchmarked version, if available"""
+    try:
+        return subprocess.run(['git', 'describe', '--always', '--dirty'],
+                              capture_output=True, text=True,
+                              cwd=os.path.dirname(os.path.abspath(__file__))
+                              ).stdout.strip() or None
+    except OSError:
+        return None
+
+
+def compare(baseline, results, threshold):
+    """Prints the change to the baseline, returns the number of regressions"""
+    print(f'{"benchmark":<28}{"baseline":>10}{"current":>10}{"change":>9}')
+    regressions = 0
+    for name, current in results['results'].items():
+        old = baseline['results'].get(name)
+        if old is None:
+            print(f'{name:<28}{"-":>10}{current["median_ms"]:10.2f}')
+            continue
+        change = (current['median_ms'] - old['median_ms']) / max(
+            old['median_ms'], 1e-6)*100
+        flag = ''
+        if change > threshold:
+            flag = '  slower'
+            regressions += 1
+        print(f'{name:<28}{old["median_ms"]:10.2f}'
+              f'{current["median_ms"]:10.2f}{change:+8.1f}%{flag}')
+    print(f'Baseline {baseline.get("version")}, current '
+          f'{results.get("version")}: {regressions} regressions above '
+          f'{threshold}%')
+    return regressions
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument("-o", "--output",
+                        default='bench.json',
+                        help="File to write the results to"
+                        )
+    parser.add_argument("-c", "--compare",
+                        help="Results of an earlier run to compare with"
+                        )
+    parser.add_argument("-r", "--results",
+                        help="Compare these results instead of running the "
+                        "benchmarks"
+                        )
+    parser.add_argument("-t", "--threshold", type=float,
+                        default=10,
+                        help="Slowdown in %% reported as regression"
+                        )
+    parser.add_argument("-n", "--repeat", type=int,
+                        default=3,
+                        help="Repetitions of each benchmark"
+                        )
+    parser.add_argument("-s", "--slides", type=int,
+                        default=4,
+                        help="Number of synthetic slides per view"
+                        )
+    parser.add_argument("-w", "--workdir",
+                        help="Folder for the synthetic film, kept for the "
+                        "next run (default: temporary folder)"
+                        )
+    args = parser.parse_args()
+
+    if args.results:
+        with open(args.results) as f:
+            results = json.load(f)
+    else:
+        app = QApplication(sys.argv)
+        work_dir = args.workdir or tempfile.mkdtemp(prefix='bubbled_bench_')
+        film_folder = os.path.join(work_dir, 'Film 2411_2510')
+        start = time.time()
+        slides = make_film(film_folder, args.slides)
+        print(f'Synthetic film ready in {time.time()-start:.1f} s')
+        config = bench_config(work_dir, film_folder)
+
+        results = {'version': version(),
+                   'date': time.strftime('%Y-%m-%d %H:%M:%S'),
+                   'python': platform.python_version(),
+                   'qt': QT_VERSION_STR,
+                   'machine': platform.machine(),
+                   'image_size': list(IMG_SIZE),
+                   'repeat': args.repeat,
+                   'results': {}}
+        results['results'].update(
+            bench_image_window(config, film_folder, slides, args.repeat))
+        results['results'].update(bench_gui(config, slides, args.repeat))
+        if not args.workdir:
+            shutil.rmtree(work_dir, ignore_errors=True)
+
+        for name, r in results['results'].items():
+            print(f'{name:<28}{r["median_ms"]:10.2f} ms (min '
+                  f'{r["min_ms"]:.2f}, n={r["n"]})')
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=1)
+        print('Results written to', args.output)
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        sys.exit(1 if compare(baseline, results, args.threshold) else 0)
@@ -0,0 +1,99 @@
+"""
+Author: Divya Pal
+Institute: Physikalisches Institut, Universität Bonn
+Modified: Oct 2026
+Purpose: Rebuilds the manifest.json of the film folders and checks every
+slide, so that broken or mismatched slides are found before the lab. The
+image headers are read by a pool of processes.
+"""
+
+import os
+import time
+import argparse
+from collections import Counter
+from multiprocessing import Pool
+from PyQt5.QtGui import QImageReader, QImage
+from packages.archive_index import ArchiveIndex
+
+
+def read_header(task):
+    """Worker: returns the image size or None if the slide is unreadable"""
+    key, path, decode = task
+    reader = QImageReader(path)
+    size = reader.size()
+    if not reader.canRead() or not size.isValid():
+        return key, None
+    if decode and QImage(path).isNull():
+        return key, None
+    return key, (size.width(), size.height())
+
+
+def check_film(pool, film_folder, decode):
+    """Scans a film folder, records the image sizes and lists the problems"""
+    index = ArchiveIndex(film_folder, manifest=False)
+    tasks = []
+    for FilmType, views in index.types.items():
+        for view, slides in views.items():
+            for ImageNo, fmts in slides.items():
+                for fmt in fmts:
+                    tasks.append(((FilmType, view, ImageNo, fmt),
+                                  os.path.join(index.folder(FilmType, view),
+                                               f'{ImageNo}.{fmt}'),
+                                  decode))
+    problems = []
+    for (FilmType, view, ImageNo, fmt), size in pool.imap_unordered(
+            read_header, tasks, chunksize=16):
+        index.set_size(FilmType, fmt, ImageNo, size, view)
+        if size is None:
+            problems.append(f'{FilmType}/view_{view}/{ImageNo}.{fmt}: '
+                            'unreadable')
+
+    for FilmType, views in index.types.items():
+        sizes = Counter(size for slides in views.values()
+                        for fmts in slides.values()
+                        for _, size in fmts.values() if size)
+        common = sizes.most_common(1)[0][0] if sizes else None
+        all_slides = set().union(*views.values())
+        for view, slides in sorted(views.items()):
+            for ImageNo in sorted(all_slides - set(slides)):
+                problems.append(f'{FilmType}/view_{view}/{ImageNo}: missing')
+            for ImageNo, fmts in sorted(slides.items()):
+                for fmt, (_, size) in fmts.items():
+                    if size and size != common:
+                        problems.append(
+                            f'{FilmType}/view_{view}/{ImageNo}.{fmt}: '
+                            f'{size[0]}x{size[1]} instead of '
+                            f'{common[0]}x{common[1]}')
+    index.manifest = True
+    index.save()
+    return len(tasks), problems
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument("-i", "--images",
+                        default='./images',
+                        help="Folder containing the Film xxxx_yyyy folders"
+                        )
+    parser.add_argument("-d", "--decode", action='store_true',
+                        help="Decode the complete images, not only headers"
+                        )
+    parser.add_argument("-j", "--jobs", type=int,
+                        default=os.cpu_count(),
+                        help="Number of processes"
+                        )
+    args = parser.parse_args()
+
+    start = time.time()
+    n_problems = 0
+    with Pool(args.jobs) as pool:
+        for film in sorted(os.listdir(args.images)):
+            film_folder = os.path.join(args.images, film)
+            if not os.path.isdir(film_folder):
+                continue
+            n_slides, problems = check_film(pool, film_folder, args.decode)
+            print(f'{film}: {n_slides} images, {len(problems)} problems')
+            for problem in problems:
+                print('   ', problem)
+            n_problems += len(problems)
+    print(f'Done in {time.time()-start:.1f} s, {n_problems} problems')
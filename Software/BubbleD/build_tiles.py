@@ -0,0 +1,74 @@
+"""
+Author: Divya Pal
+Institute: Physikalisches Institut, Universität Bonn
+Modified: Oct 2026
+Purpose: Builds the tile pyramids used for zooming into the projection for
+all slides beforehand. Otherwise they are built when a slide is zoomed into
+for the first time. Only pyramids older than their slide are built again.
+"""
+
+import os
+import time
+import argparse
+from configparser import ConfigParser
+from multiprocessing import Pool
+from packages.slide_cache import slide_path
+from packages.tile_pyramid import pyramid_path, build_pyramid
+from packages.archive_index import film_slides
+
+
+def find_slides(img_root, prescale_dir):
+    """Lists (source, pyramid) of the slides whose pyramid is missing"""
+    todo = []
+    for slide in film_slides(img_root):
+        src = slide_path(*slide)
+        dst = pyramid_path(prescale_dir, *slide)
+        if not os.path.isfile(dst) or (
+                os.path.getmtime(dst) < os.path.getmtime(src)):
+            todo.append((src, dst))
+    return todo
+
+
+def build(task):
+    """Worker: builds the pyramid of one slide"""
+    src, dst, tile = task
+    return src, build_pyramid(src, dst, tile)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument("-cfg", "--config",
+                        default='./config_table1.ini',
+                        help="Config file defining the tile size"
+                        )
+    parser.add_argument("-i", "--images",
+                        default='./images',
+                        help="Folder containing the Film xxxx_yyyy folders"
+                        )
+    parser.add_argument("-o", "--output",
+                        help="Folder for the pyramids (default: prescaled "
+                        "path of the config file)"
+                        )
+    parser.add_argument("-j", "--jobs", type=int,
+                        default=os.cpu_count(),
+                        help="Number of processes"
+                        )
+    args = parser.parse_args()
+
+    config = ConfigParser()
+    with open(args.config) as config_file:
+        config.read_file(config_file)
+    prescale_dir = args.output or config['Paths'].get('prescaled',
+                                                      './prescaled')
+    tile = int(config['GUIParamters'].get('tile_size', '512'))
+
+    todo = find_slides(args.images, prescale_dir)
+    print(f'{len(todo)} pyramids to build in {prescale_dir}')
+    start = time.time()
+    with Pool(args.jobs) as pool:
+        for i, (src, ok) in enumerate(pool.imap_unordered(
+                build, [(s, d, tile) for s, d in todo])):
+            if not ok:
+                print('Unable to read', src)
+            print(f'{i+1}/{len(todo)}', end='\r')
+    print(f'Done in {time.time()-start:.1f} s')
@@ -5,16 +5,21 @@ Modified: Mar 2022
 """
 
 if __name__ == '__main__':
+    from packages.startup import startup
     import sys
     import os
+    from packages.set_arguments import dir_path, parse_args
+    args = parse_args()
     from PyQt5.QtWidgets import QApplication
+    from PyQt5.QtCore import QTimer
     from configparser import ConfigParser
-    from packages.set_arguments import dir_path, args
+    startup.mark('imports')
 
     # Starting the application
     app = QApplication(sys.argv)
     app.setApplicationName('Bubble Chamber Display')
     app.setApplicationVersion('1.0')
+    startup.mark('application')
 
     config = ConfigParser()
     dir_path(args.config)   # Checking if path exists
@@ -35,14 +40,49 @@ if __name__ == '__main__':
             import packages.config_table1 as cfg
         config = cfg.write_config(cfg_path)
         print('Loaded default configuartion and written', cfg_path)
+    startup.mark('configuration')
 
+    if args.latency:
+        from packages.latency import tracer
+        tracer.enable()
+
+    # Measured methods are wrapped after their import, before the windows
+    diagnose = args.profile or args.memory or args.timing
+    if diagnose or args.verbose:
+        from packages.diagnostics import diagnostics
+
+    # The controller modules (pyfirmata, serial) are only imported if used
     if args.controller == 'True':
         from packages.io_control import IOcontrol
-        win = IOcontrol(args.port, config)
+        startup.mark('gui and controller import')
+        if diagnose or args.verbose:
+            diagnostics.enable(args.profile, args.memory, args.timing,
+                               args.diag_dir, args.verbose)
+        win = IOcontrol(args.port, config, args.simulate, args.speed)
     elif args.controller == 'False':
         print("Starting GUI without external controller")
         from packages.gui_control import GUIcontrol
+        startup.mark('gui import')
+        if diagnose or args.verbose:
+            diagnostics.enable(args.profile, args.memory, args.timing,
+                               args.diag_dir, args.verbose)
         win = GUIcontrol(config)
+
+    if args.record:
+        from packages.session import session
+        control = win.control if args.controller == 'True' else win
+        session.start(args.record, control.session_state())
+
+    def started():
+        startup.mark('first event')
+        print(startup.report())
+    QTimer.singleShot(0, started)
+    if diagnose:
+        diagnostics.start()
     ret = app.exec_()
     win.close()
+    if diagnose:
+        diagnostics.stop()     # After the statistics of closing
+    if args.record:
+        session.stop()
     sys.exit(ret)
@@ -0,0 +1,94 @@
+"""
+Author: Divya Pal
+Institute: Physikalisches Institut, Universität Bonn
+Modified: Oct 2026
+Purpose: Converts the image folders into film containers (one per film, film
+type and view) holding the slides uncompressed at the projected size. The
+projection memory-maps the containers instead of decoding the slides.
+Containers which are newer than all their slides are skipped.
+"""
+
+import os
+import time
+import argparse
+from configparser import ConfigParser
+from multiprocessing import Pool
+from packages.slide_cache import slide_path, prescaled_path, load_slide
+from packages.archive_index import film_slides
+from packages.film_container import container_path, write_container
+from prescale import target_size
+
+
+def find_views(img_root, prescale_dir, width, height):
+    """
+    Lists the views whose container is missing or outdated, with their
+    slides as (slide number, image format)
+    """
+    views = {}
+    for film_folder, FilmType, view, ImageNo, ImgFormat in film_slides(
+            img_root):
+        views.setdefault((film_folder, FilmType, view), []).append(
+            (ImageNo, ImgFormat))
+    todo = []
+    for (film_folder, FilmType, view), slides in views.items():
+        dst = container_path(prescale_dir, film_folder, FilmType, view,
+                             width, height)
+        newest = max(os.path.getmtime(slide_path(film_folder, FilmType, view,
+                                                 *slide))
+                     for slide in slides)
+        if not os.path.isfile(dst) or os.path.getmtime(dst) < newest:
+            todo.append((film_folder, FilmType, view, slides, dst))
+    return todo
+
+
+def scale_slide(task):
+    """Worker: returns the pixels of one slide at the projected size"""
+    src, prescaled, width, height = task
+    mtime = os.path.getmtime(src)
+    img = load_slide(src, width, height, prescaled)
+    ImageNo, ImgFormat = os.path.splitext(os.path.basename(src))
+    return (ImageNo, ImgFormat[1:], mtime, img.width(), img.height(),
+            img.bytesPerLine(), int(img.format()),
+            img.constBits().asstring(img.sizeInBytes()))
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument("-cfg", "--config",
+                        default='./config_table1.ini',
+                        help="Config file defining the projected size"
+                        )
+    parser.add_argument("-i", "--images",
+                        default='./images',
+                        help="Folder containing the Film xxxx_yyyy folders"
+                        )
+    parser.add_argument("-o", "--output",
+                        help="Folder for the containers "
+                        "(default: prescaled path of the config file)"
+                        )
+    parser.add_argument("-j", "--jobs", type=int,
+                        default=os.cpu_count(),
+                        help="Number of processes"
+                        )
+    args = parser.parse_args()
+
+    config = ConfigParser()
+    with open(args.config) as config_file:
+        config.read_file(config_file)
+    prescale_dir = args.output or config['Paths'].get('prescaled',
+                                                      './prescaled')
+    width, height = target_size(config)
+
+    todo = find_views(args.images, prescale_dir, width, height)
+    print(f'{len(todo)} containers to write at {width}x{height} in '
+          f'{prescale_dir}')
+    start = time.time()
+    with Pool(args.jobs) as pool:
+        for film_folder, FilmType, view, slides, dst in todo:
+            tasks = [(slide_path(film_folder, FilmType, view, *slide),
+                      prescaled_path(prescale_dir, film_folder, FilmType,
+                                     view, *slide, width, height),
+                      width, height) for slide in slides]
+            write_container(dst, pool.imap(scale_slide, tasks), len(tasks))
+            print(dst, f'({len(slides)} slides)')
+    print(f'Done in {time.time()-start:.1f} s')
@@ -0,0 +1,234 @@
+"""
+Author: Divya Pal
+Institute: Physikalisches Institut, Universität Bonn
+Modified: Oct 2026
+Purpose: Index of a film folder, so that the gui gets the film types, image
+formats and slides without listing the folders at every selection. The index
+is stored as manifest.json in the film folder and read at the next start.
+"""
+
+import os
+import json
+
+MANIFEST = 'manifest.json'
+MANIFEST_VERSION = 2   # Since 2 with the modification time of each image
+
+
+def film_slides(img_root):
+    """
+    Lists (film folder, film type, view, slide number, image format) of all
+    slides of the films in img_root, as found by the gui. Used by the tools
+    processing all slides; no manifest is written.
+    """
+    slides = []
+    for film in sorted(os.listdir(img_root)):
+        film_folder = os.path.join(img_root, film)
+        if not os.path.isdir(film_folder):
+            continue
+        index = ArchiveIndex(film_folder, manifest=False)
+        for FilmType, views in index.types.items():
+            for view in sorted(views):
+                for ImageNo in sorted(views[view]):
+                    for ImgFormat in sorted(views[view][ImageNo]):
+                        slides.append((film_folder, FilmType, view, ImageNo,
+                                       ImgFormat))
+    return slides
+
+
+class ArchiveIndex():
+    """
+    Film type -> view -> slide number -> image format -> (modification
+    time, image size) of one film folder. The slides are sorted numerically
+    and their positions are looked up in a dictionary. refresh() rescans
+    only folders which changed on disk. If a manifest exists, it is loaded
+    instead of scanning and a folder is only checked when it is used for
+    the first time. The images of a view are checked as well then, as an
+    image overwritten in place doesn't change its folder.
+    """
+
+    def __init__(self, film_folder, manifest=True):
+        self.film_folder = film_folder
+        self.manifest = manifest
+        self.types = {}     # FilmType -> {view: {ImageNo: {format: entry}}}
+        self.mtimes = {}    # Folder -> modification time when scanned
+        self.checked = set()  # Folders checked against the disk
+        self.sorted = {}    # (FilmType, view, format) -> (slides, positions)
+        if not (manifest and self.load()):
+            self.refresh()
+
+    def folder(self, FilmType=None, view=None):
+        """Path of the film folder, a film type or view folder"""
+        if FilmType is None:
+            return self.film_folder
+        if view is None:
+            return os.path.join(self.film_folder, FilmType)
+        return os.path.join(self.film_folder, FilmType, 'view_' + str(view))
+
+    def modified(self, folder):
+        """Checks if a folder changed since it was scanned"""
+        self.checked.add(folder)
+        try:
+            mtime = os.stat(folder).st_mtime
+        except OSError:
+            mtime = None
+        if self.mtimes.get(folder) == mtime:
+            return False
+        self.mtimes[folder] = mtime
+        self.sorted.clear()
+        return True
+
+    def refresh_film(self):
+        if not self.modified(self.film_folder):
+            return False
+        types = sorted(t for t in os.listdir(self.film_folder) if
+                       os.path.isdir(os.path.join(self.film_folder, t)))
+        self.types = {t: self.types.get(t, {}) for t in types}
+        return True
+
+    def refresh_type(self, FilmType):
+        type_dir = self.folder(FilmType)
+        if FilmType not in self.types or not self.modified(type_dir):
+            return False
+        views = self.types[FilmType]
+        found = [int(v[5:]) for v in os.listdir(type_dir)
+                 if v.startswith('view_') and v[5:].isdigit()]
+        for view in list(views):
+            if view not in found:
+                del views[view]
+        for view in found:
+            views.setdefault(view, {})
+        return True
+
+    def refresh_view(self, FilmType, view, images=False):
+        """
+        Rescans a view folder if it changed, or with images if any of its
+        images changed. The size of a changed image is unknown again.
+        """
+        view_dir = self.folder(FilmType, view)
+        views = self.types.get(FilmType, {})
+        if view not in views:
+            return False
+        changed = self.modified(view_dir)
+        if not (changed or images):
+            return False
+        old = views[view]
+        views[view] = {}
+        for entry in os.scandir(view_dir):
+            ImageNo, ImgFormat = os.path.splitext(entry.name)
+            if ImageNo.isdigit() and ImgFormat:
+                n, fmt = int(ImageNo), ImgFormat[1:]
+                mtime = entry.stat().st_mtime
+                recorded, size = old.get(n, {}).get(fmt, (None, None))
+                views[view].setdefault(n, {})[fmt] = (
+                    mtime, size if recorded == mtime else None)
+        return changed or views[view] != old
+
+    def refresh(self):
+        """Rescans the changed folders. Returns True if anything changed."""
+        changed = self.refresh_film()
+        for FilmType in list(self.types):
+            changed = self.refresh_type(FilmType) or changed
+            for view in list(self.types[FilmType]):
+                changed = self.refresh_view(FilmType, view) or changed
+        if changed:
+            self.save()
+        return changed
+
+    def validate(self, FilmType=None, view=None):
+        """Checks the folders of a query once against the disk"""
+        changed = False
+        if self.film_folder not in self.checked:
+            changed = self.refresh_film() or changed
+        if FilmType is not None and self.folder(FilmType) not in self.checked:
+            changed = self.refresh_type(FilmType) or changed
+        if view is not None and (self.folder(FilmType, view)
+                                 not in self.checked):
+            changed = self.refresh_view(FilmType, view, True) or changed
+        if changed:
+            self.save()
+
+    def load(self):
+        """Loads the manifest of the film folder. Returns True if loaded."""
+        try:
+            with open(os.path.join(self.film_folder, MANIFEST)) as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return False
+        if data.get('version') != MANIFEST_VERSION:
+            return False
+        self.types = {
+            FilmType: {int(view): {int(n): {
+                fmt: (mtime, tuple(size) if size else None)
+                for fmt, (mtime, size) in fmts.items()}
+                for n, fmts in slides.items()}
+                for view, slides in views.items()}
+            for FilmType, views in data['types'].items()}
+        self.mtimes = {self.film_folder if folder == '.' else
+                       os.path.join(self.film_folder, folder): mtime
+                       for folder, mtime in data['mtimes'].items()}
+        self.checked.clear()
+        self.sorted.clear()
+        return True
+
+    def save(self):
+        """Writes the manifest of the film folder, if possible"""
+        if not self.manifest:
+            return
+        data = {'version': MANIFEST_VERSION,
+                'mtimes': {os.path.relpath(folder, self.film_folder): mtime
+                           for folder, mtime in self.mtimes.items()},
+                'types': self.types}
+        try:
+            # Written in place, creating the file is the only change of the
+            # film folder itself, which is then not taken as a change.
+            with open(os.path.join(self.film_folder, MANIFEST), 'w') as f:
+                json.dump(data, f)
+            self.mtimes[self.film_folder] = os.stat(
+                self.film_folder).st_mtime
+        except OSError:
+            pass    # e.g. read only network share
+
+    def film_types(self):
+        """Film types (i.e. subfolders) of the film"""
+        self.validate()
+        return list(self.types)
+
+    def formats(self, FilmType, view=1):
+        """Image formats of a view"""
+        self.validate(FilmType, view)
+        slides = self.types.get(FilmType, {}).get(view, {})
+        return sorted(set().union(*slides.values()))
+
+    def slides(self, FilmType, ImgFormat, view=1):
+        """Numerically sorted slide numbers of a view in the given format"""
+        return self.lookup(FilmType, ImgFormat, view)[0]
+
+    def position(self, FilmType, ImgFormat, ImageNo, view=1):
+        """Position of a slide in slides(), None if it doesn't exist"""
+        return self.lookup(FilmType, ImgFormat, view)[1].get(int(ImageNo))
+
+    def size(self, FilmType, ImgFormat, ImageNo, view=1):
+        """
+        Image size (width, height) recorded by build_manifest.py, None if
+        unknown or the image changed since
+        """
+        self.validate(FilmType, view)
+        entry = self.types.get(FilmType, {}).get(view, {}).get(
+            int(ImageNo), {}).get(ImgFormat)
+        return entry[1] if entry else None
+
+    def set_size(self, FilmType, ImgFormat, ImageNo, size, view=1):
+        """Records the image size of a slide, None if unreadable"""
+        fmts = self.types[FilmType][view][int(ImageNo)]
+        fmts[ImgFormat] = (fmts[ImgFormat][0], size)
+
+    def lookup(self, FilmType, ImgFormat, view):
+        self.validate(FilmType, view)
+        key = (FilmType, view, ImgFormat)
+        if key not in self.sorted:
+            slides = self.types.get(FilmType, {}).get(view, {})
+            numbers = sorted(n for n, fmts in slides.items()
+                             if ImgFormat in fmts)
+            self.sorted[key] = (numbers,
+                                {n: i for i, n in enumerate(numbers)})
+        return self.sorted[key]
@@ -0,0 +1,160 @@
+"""
+Author: Divya Pal
+Institute: Physikalisches Institut, Universität Bonn
+Modified: Oct 2026
+Purpose: Combines the projected views into one image with a blend mode, so
+that the tracks of overlapping views stay visible without a separate
+"Transparent" film type. Only the changed area of the projection is combined
+again.
+"""
+
+import numpy as np
+from PyQt5.QtCore import QRect
+from PyQt5.QtGui import QImage, QRegion
+
+MODES = ('over', 'darken', 'lighten', 'multiply', 'screen')
+
+
+def pixels(img):
+    """Pixels of a 32 bit QImage as (height, width, BGRA) array copy"""
+    ptr = img.constBits()
+    ptr.setsize(img.sizeInBytes())
+    rows = np.frombuffer(ptr, np.uint8).reshape(img.height(),
+                                                img.bytesPerLine())
+    return rows[:, :img.width()*4].reshape(img.height(), img.width(),
+                                           4).copy()
+
+
+def parse_tint(value):
+    """'r,g,b' (0-255) to the factors of the B, G, R, A channels"""
+    r, g, b = (int(c) for c in value.split(','))
+    return np.array([b, g, r, 255], np.uint16)
+
+
+def multiply(a, b):
+    """a*b/255 of uint8 arrays, rounded"""
+    x = a.astype(np.uint16)*b + 128
+    return ((x + (x >> 8)) >> 8).astype(np.uint8)
+
+
+class Compositor():
+    """
+    Projection sized BGRA buffer of the background (black with the white
+    table) and the views on top. Where views overlap they are blended in
+    their order:
+        over      the later view covers the earlier ones
+        darken    darkest of the views (dark tracks on a bright film)
+        lighten   brightest of the views (bright tracks on a dark film)
+        multiply  product of the views
+        screen    inverted product of the inverted views
+    Each view is tinted by multiplying it with its colour. Opaque slides are
+    blended by their colour only; slides with transparent pixels (virtual
+    film types, premultiplied alpha) are blended like QPainter composition
+    modes, showing the background and earlier views through them.
+    """
+
+    def __init__(self, mode='darken', tints=None):
+        if mode not in MODES:
+            raise ValueError(f'Unknown blend mode {mode}, valid: {MODES}')
+        self.mode = mode
+        self.tints = tints or []
+        self.background = np.zeros((0, 0, 4), np.uint8)
+        self.out = self.background
+        self.image = QImage()
+        self.views = []
+        self.opaque = []
+
+    def setBackground(self, width, height, table):
+        """Black projection of width x height with the white table"""
+        tx, ty, tw, th = table
+        self.background = np.zeros((height, width, 4), np.uint8)
+        self.background[..., 3] = 255
+        self.background[max(ty, 0):ty + th, max(tx, 0):tx + tw, :3] = 255
+        self.out = self.background.copy()
+        self.image = QImage(self.out.data, width, height, width*4,
+                            QImage.Format_ARGB32_Premultiplied)
+
+    def setViews(self, images):
+        """
+        Takes the (rotated) views, tinted once here. Views without slide are
+        None or, if the slide is missing, a null image.
+        """
+        self.views = []
+        self.opaque = []
+        for i, img in enumerate(images):
+            if img is None or img.isNull():
+                self.views.append(None)
+                self.opaque.append(True)
+                continue
+            view = pixels(img)
+            self.opaque.append(bool(view[..., 3].min() == 255))
+            if i < len(self.tints) and (self.tints[i] != 255).any():
+                view = multiply(view, self.tints[i])
+            self.views.append(view)
+
+    def update(self, area, rects):
+        """Combines the views again within area, the views at rects"""
+        area = area.intersected(QRect(0, 0, self.out.shape[1],
+                                      self.out.shape[0]))
+        if area.isEmpty():
+            return
+        self.out[area.top():area.bottom() + 1,
+                 area.left():area.right() + 1] = \
+            self.background[area.top():area.bottom() + 1,
+                            area.left():area.right() + 1]
+        # Area covered by the earlier views, split into disjoint rectangles
+        # so that each pixel is combined once with plain slices
+        covered = QRegion()
+        for view, opaque, rect in zip(self.views, self.opaque, rects):
+            part = area.intersected(rect) if view is not None else QRect()
+            if part.isEmpty():
+                continue
+            for r in (QRegion(part) - covered).rects():
+                dst, src = self.slices(view, rect, r)
+                if opaque:
+                    dst[...] = src
+                else:
+                    self.blend(dst, src, 'over', opaque)
+            for r in (QRegion(part) & covered).rects():
+                dst, src = self.slices(view, rect, r)
+                if self.mode == 'over' and opaque:
+                    dst[...] = src
+                else:
+                    self.blend(dst, src, self.mode, opaque)
+            covered |= QRegion(part)
+
+    def slices(self, view, rect, r):
+        """Output and view pixels of the projection rectangle r"""
+        dst = self.out[r.top():r.bottom() + 1, r.left():r.right() + 1]
+        src = view[r.top() - rect.top():r.bottom() + 1 - rect.top(),
+                   r.left() - rect.left():r.right() + 1 - rect.left()]
+        return dst, src
+
+    def blend(self, dst, src, mode, opaque=True):
+        """
+        Blends src onto the opaque dst in place, which stays opaque. With
+        the alpha a of src (premultiplied) this is e.g. for darken
+        min(src, dst*a) + dst*(1 - a).
+        """
+        if mode == 'screen':
+            dst[...] = 255 - multiply(255 - dst, 255 - src)
+        elif opaque:
+            if mode == 'over':
+                dst[...] = src
+            elif mode == 'darken':
+                np.minimum(dst, src, out=dst)
+            elif mode == 'lighten':
+                np.maximum(dst, src, out=dst)
+            else:
+                dst[...] = multiply(dst, src)
+        else:
+            a = src[..., 3:]
+            behind = multiply(dst, 255 - a)     # dst*(1 - a)
+            if mode == 'over':
+                dst[...] = src + behind
+            elif mode == 'darken':
+                dst[...] = np.minimum(src, multiply(dst, a)) + behind
+            elif mode == 'lighten':
+                dst[...] = np.maximum(src, multiply(dst, a)) + behind
+            else:
+                dst[...] = multiply(dst, src) + behind
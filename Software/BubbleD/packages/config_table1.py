@@ -15,6 +15,7 @@ def write_config(path):
     config['Paths'] = {'gui': './designer/GUI_Layout.ui',
                        'icon': 'icon.png',
                        'images': './images/Film 2411_2510',
+                       'prescaled': './prescaled',   # See prescale.py
                        }
     config['GUIParamters'] = {'gui_display': '1280x800',    # '1920x1080'
                               'proj_display': '3840x2160',  # '1920x1080'
@@ -33,8 +34,29 @@ def write_config(path):
                               'dx_v1': '60',
                               'dx_v2': '60',
                               'dx_v3': '60',
+                              'cache_mb': '512',   # Slide cache budget
+                              'prefetch_slides': '2',
+                              'prefetch_workers': '2',
+                              'async_loading': 'True',
+                              'zoom_max': '8',
+                              'tile_size': '512',  # Tile pyramids for zoom
+                              'tile_cache_mb': '256',
+                              # Valid: over/darken/lighten/multiply/screen
+                              'blend_mode': 'over',
+                              'tint_v1': '255,255,255',  # r,g,b of the views
+                              'tint_v2': '255,255,255',
+                              'tint_v3': '255,255,255',
+                              # Slides shared by the instances on this PC
+                              'shared_cache_mb': '0',     # 0: not shared
+                              'shared_cache_dir': '',     # '': /dev/shm
                               }
 
+    # Film types computed from another one: 'base,threshold,alpha', the
+    # pixels brighter than threshold (0-255) get the opacity alpha (0-255)
+    config['VirtualFilmTypes'] = {'transparent_128': 'Default,128,0',
+                                  'transparent_200': 'Default,200,0',
+                                  }
+
     config['TeensyPins'] = {'port': '/dev/ttyACM0',
                             'next_slide': '7',      # '13'
                             'previous_slide': '8',  # '11'
@@ -64,7 +86,15 @@ def write_config(path):
                             'joy_polx': '+',        # Valid +/-
                             'joy_poly': '-',
                             'poti_polx': '+',
-                            'poti_poly': '-'
+                            'poti_poly': '-',
+                            'input_mode': 'poll',   # Valid poll/event
+                            'joy_event_tol': '0.01',
+                            'sampling_ms': '19',    # Firmata default
+                            'filter': 'False',      # Filtered analog input
+                            'filter_size': '64',    # Buffered samples
+                            'filter_tau_ms': '20',  # Smoothing
+                            'filter_accel': '0',    # 0: no acceleration
+                            'filter_frame_ms': '16',
                             }
     try:
         with open(path, 'w') as configfile:
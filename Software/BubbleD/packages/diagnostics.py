@@ -0,0 +1,317 @@
+"""
+Author: Divya Pal
+Institute: Physikalisches Institut, Universität Bonn
+Modified: Oct 2026
+Purpose: Diagnostics selected from the command line: profiling of the event
+loop (deterministic with cProfile or by sampling the call stack), memory
+allocations around loading and painting slides (tracemalloc) and the time
+spent in each subsystem. The methods are only wrapped when an option is
+selected, before the windows are created, so there is no overhead otherwise.
+The statistics of the caches, rendering and inputs are reported on exit.
+"""
+
+import os
+import sys
+import time
+import pstats
+import inspect
+import cProfile
+import functools
+import threading
+import tracemalloc
+from collections import Counter, defaultdict
+
+# Measured methods of each subsystem, as (module, class, methods)
+SUBSYSTEMS = {
+    'I/O control': [('packages.io_control', 'IOcontrol', ['updateInput'])],
+    'GUI handlers': [('packages.gui_control', 'GUIcontrol', [
+        'folder_selection', 'refresh_index', 'set_img_type', 'set_img_format',
+        'set_table', 'get_slide_num', 'enable_projection',
+        'set_sbx_displacement', 'set_hsl_displacement', 'show_displacement',
+        'reset_displacement', 'set_zoom', 'show_zoom', 'reset_zoom',
+        'reset_all'])],
+    'image loading': [('packages.image_window', 'ImageWindow', [
+        'selectImage', 'loadSlides', 'showSlides', 'getSlide']),
+        ('packages.prefetch', 'SlidePrefetcher', ['load'])],
+    'painting': [('packages.render_scheduler', 'RenderScheduler', ['render']),
+                 ('packages.image_window', 'ImageWindow', ['paintEvent'])],
+}
+
+
+def wrap(cls, name, wrapper):
+    """Replaces the method name of cls by wrapper(method)"""
+    method = getattr(cls, name)
+    code = inspect.unwrap(method).__code__
+    n_args = None if code.co_flags & inspect.CO_VARARGS else code.co_argcount
+
+    def trimmed(*args, **kwargs):
+        # Qt signals pass their arguments, unless the slot takes fewer
+        return method(*args[:n_args], **kwargs)
+    setattr(cls, name, functools.wraps(method)(wrapper(trimmed)))
+
+
+class SubsystemTimer():
+    """
+    Time spent in the methods of each subsystem. Time spent in a method of
+    another subsystem called from it (e.g. painting called by a gui handler)
+    is only counted for the called one.
+    """
+
+    def __init__(self):
+        self.calls = Counter()
+        self.total = defaultdict(float)
+        self.own = defaultdict(float)
+        self.max = defaultdict(float)
+        self.local = threading.local()  # Stack of the running methods
+
+    def instrument(self, subsystem, cls, name):
+        def wrapper(method):
+            def timed(*args, **kwargs):
+                key = (subsystem, f'{cls.__name__}.{name}',
+                       threading.current_thread() is threading.main_thread())
+                stack = self.local.__dict__.setdefault('stack', [])
+                stack.append(0.0)
+                start = time.perf_counter()
+                try:
+                    return method(*args, **kwargs)
+                finally:
+                    t = time.perf_counter() - start
+                    children = stack.pop()
+                    if stack:
+                        stack[-1] += t
+                    self.calls[key] += 1
+                    self.total[key] += t
+                    self.own[key] += t - children
+                    self.max[key] = max(self.max[key], t)
+            return timed
+        wrap(cls, name, wrapper)
+
+    def report(self, elapsed):
+        lines = [f'Time per subsystem in {elapsed:.1f} s (own: without the '
+                 'called methods of the other subsystems)',
+                 f'{"":<48}{"calls":>8}{"own ms":>11}{"total ms":>11}'
+                 f'{"max ms":>9}']
+        subsystems = defaultdict(list)
+        for key in self.calls:
+            subsystems[key[0]].append(key)
+        for subsystem, keys in subsystems.items():
+            for main in (True, False):
+                part = [k for k in keys if k[2] == main]
+                if not part:
+                    continue
+                own = sum(self.own[k] for k in part)
+                name = subsystem if main else subsystem + ' (background)'
+                lines.append(f'{name:<48}{sum(self.calls[k] for k in part):8}'
+                             f'{own*1000:11.1f}{"":>11}{"":>9}')
+                for k in sorted(part, key=lambda k: -self.own[k]):
+                    lines.append(f'  {k[1]:<46}{self.calls[k]:8}'
+                                 f'{self.own[k]*1000:11.1f}'
+                                 f'{self.total[k]*1000:11.1f}'
+                                 f'{self.max[k]*1000:9.1f}')
+        return '\n'.join(lines)
+
+
+class SamplingProfiler():
+    """
+    Samples the call stack of the main thread every interval seconds from a
+    background thread. Functions running in Qt (with the interpreter lock
+    released) are counted for the Python function calling them.
+    """
+
+    def __init__(self, interval=0.005):
+        self.interval = interval
+        self.own = Counter()        # Samples in the function itself
+        self.total = Counter()      # Samples in the function or its callees
+        self.samples = 0
+        self.running = False
+        self.thread = None
+
+    def start(self):
+        self.running = True
+        self.thread = threading.Thread(target=self.run, daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        self.running = False
+        if self.thread is not None:
+            self.thread.join()
+
+    def run(self):
+        main = threading.main_thread().ident
+        while self.running:
+            time.sleep(self.interval)
+            frame = sys._current_frames().get(main)
+            if frame is None:
+                continue
+            self.samples += 1
+            self.own[self.function(frame)] += 1
+            seen = set()
+            while frame is not None:
+                seen.add(self.function(frame))
+                frame = frame.f_back
+            self.total.update(seen)
+
+    @staticmethod
+    def function(frame):
+        code = frame.f_code
+        return (f'{os.path.basename(code.co_filename)}:'
+                f'{code.co_firstlineno}({code.co_name})')
+
+    def report(self, top=30):
+        lines = [f'{self.samples} samples every {self.interval*1000:.0f} ms',
+                 f'{"own %":>7}{"total %":>9}  function']
+        n = max(self.samples, 1)
+        for function, count in self.own.most_common(top):
+            lines.append(f'{count/n*100:7.1f}{self.total[function]/n*100:9.1f}'
+                         f'  {function}')
+        lines += ['', f'{"total %":>16}  function (incl. called functions)']
+        for function, count in self.total.most_common(top):
+            lines.append(f'{count/n*100:16.1f}  {function}')
+        return '\n'.join(lines)
+
+
+class MemoryTracer():
+    """
+    Memory allocated by Python (including NumPy arrays, not the pixels held
+    by Qt) during each call of the traced methods, and the difference of the
+    snapshots taken at the start and end of the event loop.
+    """
+
+    def __init__(self, frames=10):
+        self.frames = frames
+        self.calls = Counter()
+        self.net = defaultdict(int)     # Allocated and not freed
+        self.peak = defaultdict(int)    # Largest peak of a call
+        self.first = None
+
+    def instrument(self, cls, name):
+        def wrapper(method):
+            def traced(*args, **kwargs):
+                before = tracemalloc.get_traced_memory()[0]
+                tracemalloc.reset_peak()
+                try:
+                    return method(*args, **kwargs)
+                finally:
+                    current, peak = tracemalloc.get_traced_memory()
+                    key = f'{cls.__name__}.{name}'
+                    self.calls[key] += 1
+                    self.net[key] += current - before
+                    self.peak[key] = max(self.peak[key], peak - before)
+            return traced
+        wrap(cls, name, wrapper)
+
+    def start(self):
+        tracemalloc.start(self.frames)
+        self.first = tracemalloc.take_snapshot()
+
+    def report(self, top=20):
+        last = tracemalloc.take_snapshot()
+        lines = [f'{"":<28}{"calls":>8}{"net MB":>10}{"max peak MB":>13}']
+        for key in sorted(self.calls):
+            lines.append(f'{key:<28}{self.calls[key]:8}'
+                         f'{self.net[key]/2**20:10.2f}'
+                         f'{self.peak[key]/2**20:13.2f}')
+        lines += ['', 'Largest differences since the start of the event loop:']
+        for stat in last.compare_to(self.first, 'lineno')[:top]:
+            lines.append(str(stat))
+        tracemalloc.stop()
+        return '\n'.join(lines)
+
+
+class Diagnostics():
+    """Diagnostics of the command line options, written to files on exit"""
+
+    def __init__(self):
+        self.enabled = False
+        self.folder = '.'
+        self.profile = None
+        self.profiler = None
+        self.memory = None
+        self.timing = None
+        self.start_time = 0
+        self.verbose = False
+        self.statistics = []
+
+    def enable(self, profile=None, memory=False, timing=False, folder='.',
+               verbose=False):
+        """
+        Selects the diagnostics, after importing the measured modules and
+        before creating the windows
+        """
+        self.folder = folder
+        self.verbose = verbose
+        self.profile = profile
+        self.memory = MemoryTracer() if memory else None
+        self.timing = SubsystemTimer() if timing else None
+        self.enabled = bool(profile or memory or timing)
+        # Only the imported modules are measured (the controller if used)
+        if self.timing is not None:
+            for subsystem, methods in SUBSYSTEMS.items():
+                for module, cls_name, names in methods:
+                    if module in sys.modules:
+                        cls = getattr(sys.modules[module], cls_name)
+                        for name in names:
+                            self.timing.instrument(subsystem, cls, name)
+        if self.memory is not None and 'packages.image_window' in sys.modules:
+            cls = sys.modules['packages.image_window'].ImageWindow
+            for name in ('selectImage', 'paintEvent'):
+                self.memory.instrument(cls, name)
+
+    def start(self):
+        """Starts measuring at the start of the event loop"""
+        if self.memory is not None:
+            self.memory.start()
+        if self.profile == 'cprofile':
+            self.profiler = cProfile.Profile()
+            self.profiler.enable()
+        elif self.profile == 'sample':
+            self.profiler = SamplingProfiler()
+            self.profiler.start()
+        self.start_time = time.perf_counter()
+
+    def stats(self, text):
+        """
+        Statistics of a component on exit, printed if verbose and written
+        with the selected diagnostics
+        """
+        if self.verbose:
+            print(text)
+        if self.enabled:
+            self.statistics.append(text)
+
+    def stop(self):
+        """Writes the results after the windows were closed"""
+        elapsed = time.perf_counter() - self.start_time
+        os.makedirs(self.folder, exist_ok=True)
+        written = []
+        if self.profile == 'cprofile':
+            self.profiler.disable()
+            path = os.path.join(self.folder, 'profile.prof')
+            self.profiler.dump_stats(path)
+            written.append(path)
+            with open(os.path.join(self.folder, 'profile.txt'), 'w') as f:
+                pstats.Stats(path, stream=f).sort_stats(
+                    'cumulative').print_stats(40)
+            written.append(os.path.join(self.folder, 'profile.txt'))
+        elif self.profile == 'sample':
+            self.profiler.stop()
+            written.append(self.write('profile.txt', self.profiler.report()))
+        if self.memory is not None:
+            written.append(self.write('memory.txt', self.memory.report()))
+        if self.timing is not None:
+            written.append(self.write('timing.txt',
+                                      self.timing.report(elapsed)))
+        if self.statistics:
+            written.append(self.write('stats.txt',
+                                      '\n'.join(self.statistics)))
+        print('Diagnostics written to', ', '.join(written))
+
+    def write(self, name, text):
+        path = os.path.join(self.folder, name)
+        with open(path, 'w') as f:
+            f.write(text + '\n')
+        return path
+
+
+# Enabled by main.py
+diagnostics = Diagnostics()
@@ -0,0 +1,70 @@
+"""
+Author: Divya Pal
+Institute: Physikalisches Institut, Universität Bonn
+Modified: Oct 2026
+Purpose: Holds the displacement of all views. The spin boxes, slidders and
+the external controller change it through this model, which notifies the
+gui and projection once per user action.
+"""
+
+from contextlib import contextmanager
+from PyQt5.QtCore import QObject, pyqtSignal
+
+
+class DisplacementModel(QObject):
+    """
+    Displacement dx/dy of every view, limited to the allowed range.
+    Changes made within a batch are notified once at the end of the batch.
+    """
+    changed = pyqtSignal()
+
+    def __init__(self, n_view, x_range, y_range):
+        super().__init__()
+        self.dx = [0]*n_view
+        self.dy = [0]*n_view
+        self.x_range = x_range
+        self.y_range = y_range
+        self.actions = 0        # User actions changing the displacement
+        self.notifications = 0  # Emitted changes
+        self.depth = 0
+        self.dirty = False
+
+    @contextmanager
+    def batch(self):
+        """Collects all changes of one user action into one notification"""
+        if self.depth == 0:
+            self.actions += 1
+        self.depth += 1
+        try:
+            yield self
+        finally:
+            self.depth -= 1
+            if self.depth == 0 and self.dirty:
+                self.dirty = False
+                self.notifications += 1
+                self.changed.emit()
+
+    def set(self, view, dx=None, dy=None):
+        """Sets the displacement of one view"""
+        with self.batch():
+            if dx is not None:
+                dx = min(max(int(dx), self.x_range[0]), self.x_range[1])
+                if dx != self.dx[view]:
+                    self.dx[view] = dx
+                    self.dirty = True
+            if dy is not None:
+                dy = min(max(int(dy), self.y_range[0]), self.y_range[1])
+                if dy != self.dy[view]:
+                    self.dy[view] = dy
+                    self.dirty = True
+
+    def set_all(self, dx, dy):
+        """Sets the displacement of all views"""
+        with self.batch():
+            for view in range(len(self.dx)):
+                self.set(view, dx[view], dy[view])
+
+    def stats(self):
+        """Summary of the displacement changes"""
+        return (f'Displacement: {self.actions} actions, '
+                f'{self.notifications} updates')
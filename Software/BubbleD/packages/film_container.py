@@ -0,0 +1,136 @@
+"""
+Author: Divya Pal
+Institute: Physikalisches Institut, Universität Bonn
+Modified: Oct 2026
+Purpose: Reads and writes film containers, i.e. all slides of one film, film
+type and view stored as uncompressed pixels at the projected size and
+orientation. The
+container is memory-mapped and the slides are used without decoding or
+copying.
+
+Layout of a container (little endian):
+    header  magic b'BUBD', version, number of slides
+    index   per slide: slide number, width, height, bytes per line,
+            QImage format, offset of the pixels, image format and
+            modification time of the source slide
+    pixels  of every slide, each starting at a page boundary
+"""
+
+import os
+import mmap
+import struct
+import threading
+from PyQt5.QtGui import QImage
+from packages.slide_cache import slide_path
+
+MAGIC = b'BUBD'
+VERSION = 3   # Since 3 with the format and modification time of the source
+HEADER = struct.Struct('<4sII')
+ENTRY = struct.Struct('<IIIIIQ8sd')
+PAGE = mmap.ALLOCATIONGRANULARITY
+
+
+def container_path(prescale_dir, img_folder, FilmType, view, width, height):
+    """Path of the container of a film view at the size width x height"""
+    return os.path.join(prescale_dir,
+                        os.path.basename(os.path.normpath(img_folder)),
+                        FilmType, f'view_{view}_{width}x{height}.bfc')
+
+
+def write_container(path, slides, n_slides):
+    """
+    Writes a container from an iterable of n_slides (slide number, image
+    format and modification time of the source, width, height, bytes per
+    line, QImage format, pixels).
+    The slides are streamed, only the index is kept in memory.
+    """
+    index = []
+    tmp = path + '.tmp'
+    head = HEADER.size + ENTRY.size*n_slides
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(tmp, 'wb') as f:
+        f.write(b'\0' * (head + -head % PAGE))  # Header and index, see below
+        for ImageNo, ImgFormat, mtime, width, height, bpl, fmt, pixels in \
+                slides:
+            f.seek(-f.tell() % PAGE, os.SEEK_END)
+            index.append((int(ImageNo), width, height, bpl, fmt, f.tell(),
+                          ImgFormat.encode(), mtime))
+            f.write(pixels)
+        if len(index) != n_slides:
+            raise ValueError(f'Expected {n_slides} slides for {path}')
+        f.seek(0)
+        f.write(HEADER.pack(MAGIC, VERSION, len(index)))
+        for entry in index:
+            f.write(ENTRY.pack(*entry))
+    os.replace(tmp, path)
+
+
+class FilmContainer():
+    """
+    Memory-mapped container giving the slides as QImage without copy. The
+    slides are indexed by slide number and image format of the source.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        with open(path, 'rb') as f:
+            self.data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, n_slides = HEADER.unpack_from(self.data, 0)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f'{path} is not a film container')
+        self.index = {}
+        for i in range(n_slides):
+            ImageNo, *entry, ImgFormat, mtime = ENTRY.unpack_from(
+                self.data, HEADER.size + i*ENTRY.size)
+            self.index[(ImageNo, ImgFormat.rstrip(b'\0').decode())] = (
+                *entry, mtime)
+
+    def mtime(self, ImageNo, ImgFormat):
+        """Modification time of the packed source, None if not packed"""
+        entry = self.index.get((int(ImageNo), ImgFormat))
+        return entry[5] if entry else None
+
+    def image(self, ImageNo, ImgFormat):
+        """QImage using the mapped pixels of the slide"""
+        width, height, bpl, fmt, offset, _ = self.index[(int(ImageNo),
+                                                         ImgFormat)]
+        return QImage(memoryview(self.data)[offset:offset + bpl*height],
+                      width, height, bpl, QImage.Format(fmt))
+
+
+class ContainerStore():
+    """Opens the containers of the requested slides once and keeps them"""
+
+    def __init__(self, prescale_dir=None):
+        self.prescale_dir = prescale_dir
+        self.containers = {}
+        self.lock = threading.Lock()  # Used by the loading threads
+
+    def image(self, key):
+        """
+        Returns the slide of a cache key from its container, or None if there
+        is no container holding the slide at the requested size and format,
+        or the slide changed since it was packed.
+        """
+        if not self.prescale_dir:
+            return None
+        img_folder, FilmType, view, ImageNo, ImgFormat, width, height = key
+        path = container_path(self.prescale_dir, img_folder, FilmType, view,
+                              width, height)
+        with self.lock:
+            if path not in self.containers:
+                try:
+                    self.containers[path] = FilmContainer(path)
+                except (OSError, ValueError):
+                    self.containers[path] = None
+            container = self.containers[path]
+        if container is None:
+            return None
+        packed = container.mtime(ImageNo, ImgFormat)
+        try:
+            if packed is None or packed != os.path.getmtime(
+                    slide_path(*key[:5])):
+                return None
+        except OSError:
+            return None
+        return container.image(ImageNo, ImgFormat)
@@ -18,12 +18,20 @@ Common abbreviations used in the ui:
     hbl/vbl QHBoxLayout/QVBoxLayout
 """
 
-import os
 import numpy as np
 from PyQt5.QtWidgets import (QMainWindow, QFileDialog, QMessageBox)
-from PyQt5 import uic
+from PyQt5.QtCore import QFileSystemWatcher, QTimer
 from PyQt5.QtGui import QIcon, QImageReader, QGuiApplication, QScreen
 from packages.image_window import ImageWindow
+from packages.compositor import parse_tint
+from packages.virtual_film import virtual_types
+from packages.displacement import DisplacementModel
+from packages.archive_index import ArchiveIndex
+from packages.latency import tracer
+from packages.ui_cache import load_ui
+from packages.startup import startup
+from packages.session import session
+from packages.diagnostics import diagnostics
 import platform
 
 ''' To set the icon correctly in a windows uncomment the lines below'''
@@ -42,14 +50,34 @@ class GUIcontrol(QMainWindow):
         super(GUIcontrol, self).__init__()
         self.config = config
         self.set_path()
-        uic.loadUi(self.gui_path, self)
+        load_ui(self.gui_path, self)
         self.set_icon()
+        startup.mark('gui layout')
+        self.virtual = virtual_types(config)
+        ctrl = self.ctrl
+        self.im_win = ImageWindow(
+            self.icon_path,
+            cache_mb=float(ctrl.get('cache_mb', '512')),
+            prefetch_workers=int(ctrl.get('prefetch_workers', '2')),
+            async_load=ctrl.get('async_loading', 'True') == 'True',
+            prescale_dir=self.path.get('prescaled'),
+            tile_mb=float(ctrl.get('tile_cache_mb', '256')),
+            tile_size=int(ctrl.get('tile_size', '512')),
+            blend_mode=ctrl.get('blend_mode', 'over'),
+            tints=[parse_tint(ctrl.get(f'tint_v{i}', '255,255,255'))
+                   for i in range(1, 4)],
+            virtual=self.virtual,
+            shared_mb=float(ctrl.get('shared_cache_mb', '0')),
+            shared_dir=ctrl.get('shared_cache_dir') or None)
+        self.im_win.loadFailed.connect(self.errorhandling)
         self.initialise_gui()
         self.set_defaults()
         self.connect_buttons()
-        self.im_win = ImageWindow(self.icon_path)
+        startup.mark('gui setup')
         self.folder_selection()
+        startup.mark('film folder')
         self.show_display()
+        startup.mark('display')
 
     def set_path(self):
         """Defines the relative paths"""
@@ -154,7 +182,27 @@ class GUIcontrol(QMainWindow):
         self.box_SlideNumber.setEnabled(True)
         self.box_ImgProp.setEnabled(True)
         self.box_table.setEnabled(False)
-        self.reset_flag = 0
+        self.displacement = DisplacementModel(
+            3, (int(self.ctrl['x_min']), int(self.ctrl['x_max'])),
+            (int(self.ctrl['y_min']), int(self.ctrl['y_max'])))
+        self.displacement.changed.connect(self.show_displacement)
+        self.dx = list(self.displacement.dx)
+        self.dy = list(self.displacement.dy)
+        # Panning of the zoomed projection, limited when zooming
+        self.zoom = 1
+        self.sbx_zoom.setRange(1, float(self.ctrl.get('zoom_max', '8')))
+        self.pan = DisplacementModel(1, (0, 0), (0, 0))
+        self.pan.changed.connect(self.show_zoom)
+        self.index = None
+        self.watcher = QFileSystemWatcher(self)
+        self.watcher.directoryChanged.connect(self.refresh_index)
+        self.n_prefetch = int(self.ctrl.get('prefetch_slides', '2'))
+        self.slide_idx = 0
+        self.step_dir = 1
+        if tracer.enabled:
+            self.timerLatency = QTimer(self)
+            self.timerLatency.timeout.connect(self.show_latency)
+            self.timerLatency.start(1000)
 
     def set_defaults(self):
         ''' Sets the default values'''
@@ -174,19 +222,12 @@ class GUIcontrol(QMainWindow):
 
     def set_default_displacement(self):
         """ Sets the default displacement"""
-        self.dy = [int(self.ctrl['dy_v1']),
-                   int(self.ctrl['dy_v2']),
-                   int(self.ctrl['dy_v3'])]
-        self.dx = [int(self.ctrl['dx_v1']),
-                   int(self.ctrl['dx_v2']),
-                   int(self.ctrl['dx_v3'])]
-        for i in range(0, self.Nv):
-            self.sbx_x[i].setValue(self.dx[i])
-            self.sbx_y[i].setValue(self.dy[i])
-            self.hsl_x[i].setValue(self.dx[i])
-            self.hsl_y[i].setValue(self.dy[i])
-
-        self.reset_flag = 0
+        self.displacement.set_all(dx=[int(self.ctrl['dx_v1']),
+                                      int(self.ctrl['dx_v2']),
+                                      int(self.ctrl['dx_v3'])],
+                                  dy=[int(self.ctrl['dy_v1']),
+                                      int(self.ctrl['dy_v2']),
+                                      int(self.ctrl['dy_v3'])])
 
     def connect_buttons(self):
         """
@@ -233,6 +274,12 @@ class GUIcontrol(QMainWindow):
         # --- Displacement---
         self.btn_adj_rst.clicked.connect(self.reset_displacement)
 
+        # Zoom
+        self.sbx_zoom.valueChanged.connect(self.set_zoom)
+        self.btn_zoomN.clicked.connect(self.sbx_zoom.stepDown)
+        self.btn_zoomP.clicked.connect(self.sbx_zoom.stepUp)
+        self.btn_zoom_rst.clicked.connect(self.reset_zoom)
+
         # Spin box entry
         [x.valueChanged.connect(self.set_sbx_displacement) for x in self.sbx_x]
         [y.valueChanged.connect(self.set_sbx_displacement) for y in self.sbx_y]
@@ -258,20 +305,46 @@ class GUIcontrol(QMainWindow):
 
     def folder_selection(self):
         """ Selects & displays the image folder in the line edit"""
-        if self.txt_FolderName.text() is None:
-            self.errorhandling('Error: Please select a folder!')
-        else:
-            self.film_folder = self.txt_FolderName.text()
-        self.box_ImgProp.setEnabled(True)
-        self.get_img_type()
+        with session.action('folder', self.txt_FolderName.text()):
+            if self.txt_FolderName.text() is None:
+                self.errorhandling('Error: Please select a folder!')
+            else:
+                self.film_folder = self.txt_FolderName.text()
+            if (self.index is None or
+                    self.index.film_folder != self.film_folder):
+                self.index = ArchiveIndex(self.film_folder)
+            else:
+                self.index.refresh()
+            self.watch_folder()
+            self.box_ImgProp.setEnabled(True)
+            self.get_img_type()
+
+    def watch_folder(self):
+        """Watches the indexed folders for added or removed slides"""
+        if self.watcher.directories():
+            self.watcher.removePaths(self.watcher.directories())
+        self.watcher.addPaths([folder for folder, mtime in
+                               self.index.mtimes.items() if mtime])
+
+    def refresh_index(self):
+        """Updates the slide list when the film folder changed on disk"""
+        if self.index.refresh():
+            self.watch_folder()
+            slide_num = self.slide_num
+            self.get_film_list()
+            idx = self.index.position(self.source_type(), self.img_format,
+                                      slide_num)
+            if idx is not None:
+                self.sbx_SlideNumber.setValue(idx)
 
     def get_img_type(self, view=1):
         """
         Gets all the subfolder.
         This is added to easily switch between original and editted images.
         """
-        self.img_type_list = sorted(folder for folder in sorted(
-                                      os.listdir(self.film_folder)))
+        self.img_type_list = self.index.film_types()
+        self.img_type_list += [name for name, v in self.virtual.items()
+                               if v.base in self.img_type_list]
         self.cbx_FilmType.clear()
         self.cbx_FilmType.addItems(self.img_type_list)
         if not self.img_type_list:
@@ -285,14 +358,19 @@ class GUIcontrol(QMainWindow):
         """
         Changes the image type (i.e. subfolder) to selected value.
         """
-        self.img_type = self.cbx_FilmType.currentText()
-        self.get_img_format()
+        with session.action('film_type', self.cbx_FilmType.currentText()):
+            self.img_type = self.cbx_FilmType.currentText()
+            self.get_img_format()
+
+    def source_type(self):
+        """Film type of the image folders used by the selected film type"""
+        if self.img_type in self.virtual:
+            return self.virtual[self.img_type].base
+        return self.img_type
 
     def get_img_format(self, view=1):
         """ Gets the selected image format"""
-        self.img_dir = self.film_folder+'/'+self.img_type+'/view_'+str(view)
-        self.img_format_list = sorted(set([img[-3:] for img in
-                                           sorted(os.listdir(self.img_dir))]))
+        self.img_format_list = self.index.formats(self.source_type(), view)
         self.cbx_ImgFormat.clear()
         self.cbx_ImgFormat.addItems(self.img_format_list)
 
@@ -305,13 +383,15 @@ class GUIcontrol(QMainWindow):
 
     def set_img_format(self):
         """ Set the image"""
-        self.img_format = self.cbx_ImgFormat.currentText()
-        if self.img_format.lower() in QImageReader().supportedImageFormats():
-            self.get_film_list()
-        else:
-            self.errorhandling('Error: Unaccepted image format',
-                               'Please ensure the image is'
-                               'supported by QImage.')
+        with session.action('format', self.cbx_ImgFormat.currentText()):
+            self.img_format = self.cbx_ImgFormat.currentText()
+            formats = QImageReader().supportedImageFormats()
+            if self.img_format.lower() in formats:
+                self.get_film_list()
+            else:
+                self.errorhandling('Error: Unaccepted image format',
+                                   'Please ensure the image is'
+                                   'supported by QImage.')
 
     def enable_table(self):
         """Enables adjustment of Table parameters"""
@@ -322,16 +402,21 @@ class GUIcontrol(QMainWindow):
 
     def set_table(self):
         """Adjustment of Table parameters"""
-        self.xTable = self.sbx_xtable.value()
-        self.yTable = self.sbx_ytable.value()
-        self.wTable = self.sbx_wtable.value()
-        self.hTable = self.sbx_htable.value()
-        self.update_projection()
+        with session.action('table', self.sbx_xtable.value(),
+                            self.sbx_ytable.value(), self.sbx_wtable.value(),
+                            self.sbx_htable.value()):
+            self.xTable = self.sbx_xtable.value()
+            self.yTable = self.sbx_ytable.value()
+            self.wTable = self.sbx_wtable.value()
+            self.hTable = self.sbx_htable.value()
+            self.set_pan_limits()
+            self.update_projection()
 
     def get_film_list(self):
         """Creates a list of all slides in the film"""
-        self.film_list = [img[:-4] for img in sorted(os.listdir(self.img_dir))
-                          if img.endswith(self.img_format)]
+        self.film_list = [str(n) for n in
+                          self.index.slides(self.source_type(),
+                                            self.img_format)]
         self.cbx_SlideNumber.clear()
         self.cbx_SlideNumber.addItems(self.film_list)
         self.NFilms = len(self.film_list)
@@ -340,10 +425,15 @@ class GUIcontrol(QMainWindow):
 
     def get_slide_num(self):
         """Gets the current slide number"""
-        self.slide_num = int(self.cbx_SlideNumber.currentText())
-        self.update_projection()
-        self.sbx_SlideNumber.setValue(
-            self.film_list.index(str(self.slide_num)))
+        with session.action('slide', self.cbx_SlideNumber.currentText()):
+            self.slide_num = int(self.cbx_SlideNumber.currentText())
+            idx = self.index.position(self.source_type(), self.img_format,
+                                      self.slide_num)
+            if idx != self.slide_idx:
+                self.step_dir = 1 if idx > self.slide_idx else -1
+            self.slide_idx = idx
+            self.update_projection()
+            self.sbx_SlideNumber.setValue(idx)
 
     def set_slide_num(self):
         """Selects a particular slide"""
@@ -358,9 +448,11 @@ class GUIcontrol(QMainWindow):
     def enable_projection(self):
         """ Enables the projection and the controller tab
             for the selected view"""
-        if (v.isChecked() for v in self.btn_PV):
-            self.projViews = np.array([v.isChecked()*1 for v in self.btn_PV])
-            self.update_projection()
+        with session.action('views', [v.isChecked() for v in self.btn_PV]):
+            if (v.isChecked() for v in self.btn_PV):
+                self.projViews = np.array([v.isChecked()*1
+                                           for v in self.btn_PV])
+                self.update_projection()
 
     def update_projection(self):
         """Updates the projected image"""
@@ -376,11 +468,31 @@ class GUIcontrol(QMainWindow):
                                 tw=self.wTable,
                                 th=self.hTable,
                                 scale=self.imgScale)
+        self.prefetch_slides()
+
+    def prefetch_slides(self):
+        """Prefetches the next slides in the direction of stepping"""
+        slides = [self.film_list[i] for i in
+                  range(self.slide_idx + self.step_dir,
+                        self.slide_idx + self.step_dir*(self.n_prefetch+1),
+                        self.step_dir)
+                  if 0 <= i < self.NFilms]
+        self.im_win.prefetchSlides(img_folder=self.film_folder,
+                                   View=self.projViews,
+                                   FilmType=self.img_type,
+                                   slides=[int(n) for n in slides],
+                                   ImgFormat=self.img_format,
+                                   tw=self.wTable,
+                                   th=self.hTable,
+                                   scale=self.imgScale)
 
     def start_projection(self):
         """ Starts the projection screen"""
         self.update_projection()
         self.im_win.move(self.projector.left(), self.projector.top())
+        screen = QGuiApplication.screenAt(self.projector.center())
+        if screen is not None:
+            self.im_win.scheduler.setRefreshRate(screen.refreshRate())
         self.im_win.showFullScreen()
         self.box_PositionAdjustment.setEnabled(True)
 
@@ -391,27 +503,66 @@ class GUIcontrol(QMainWindow):
 
     def set_sbx_displacement(self):
         """Sets the value of image displacement through the QSpinBox"""
-        if self.reset_flag == 0:
-            self.dx = [x.value() for x in self.sbx_x]
-            self.dy = [y.value() for y in self.sbx_y]
-            [self.hsl_x[i].setValue(self.dx[i]) for i in range(0, self.Nv)]
-            [self.hsl_y[i].setValue(self.dy[i]) for i in range(0, self.Nv)]
-            self.im_win.setDisplacement(dx=self.dx, dy=self.dy)
+        tracer.input()
+        self.displacement.set_all(dx=[x.value() for x in self.sbx_x],
+                                  dy=[y.value() for y in self.sbx_y])
+        tracer.drop()
 
     def set_hsl_displacement(self):
         """Sets the value of image displacement through the Qslidder"""
-        if self.reset_flag == 0:
-            self.dx = [x.value() for x in self.hsl_x]
-            self.dy = [y.value() for y in self.hsl_y]
-            [self.sbx_x[i].setValue(self.dx[i]) for i in range(0, self.Nv)]
-            [self.sbx_y[i].setValue(self.dy[i]) for i in range(0, self.Nv)]
+        tracer.input()
+        self.displacement.set_all(dx=[x.value() for x in self.hsl_x],
+                                  dy=[y.value() for y in self.hsl_y])
+        tracer.drop()
+
+    def show_displacement(self):
+        """
+        Shows the displacement of the model in the spin boxes, slidders and
+        the projection. Signals are blocked to avoid updating back the model.
+        """
+        with session.action('displacement', list(self.displacement.dx),
+                            list(self.displacement.dy)):
+            self.dx = list(self.displacement.dx)
+            self.dy = list(self.displacement.dy)
+            for i in range(0, self.Nv):
+                for widget, value in ((self.sbx_x[i], self.dx[i]),
+                                      (self.hsl_x[i], self.dx[i]),
+                                      (self.sbx_y[i], self.dy[i]),
+                                      (self.hsl_y[i], self.dy[i])):
+                    widget.blockSignals(True)
+                    widget.setValue(value)
+                    widget.blockSignals(False)
+            tracer.stage('widgets')
             self.im_win.setDisplacement(dx=self.dx, dy=self.dy)
 
     def reset_displacement(self):
         """ Resets the displacement to default value"""
-        self.reset_flag = 1  # Ensures simultaneous reset of all displacements
         self.set_default_displacement()
-        self.set_sbx_displacement()
+
+    def set_zoom(self):
+        """Zooms the projection, the joystick then pans the zoomed area"""
+        with session.action('zoom', self.sbx_zoom.value()):
+            self.zoom = self.sbx_zoom.value()
+            self.set_pan_limits()
+            self.show_zoom()
+
+    def set_pan_limits(self):
+        """Limits the panning to keep the zoomed area in the (rotated) views,
+        which are at most as large as the table"""
+        px = int(self.wTable*self.imgScale*(self.zoom - 1)/2)
+        py = int(self.hTable*self.imgScale*(self.zoom - 1)/2)
+        self.pan.x_range, self.pan.y_range = (-px, px), (-py, py)
+        self.pan.set(0, self.pan.dx[0], self.pan.dy[0])
+
+    def show_zoom(self):
+        """Shows the zoomed area in the projection"""
+        with session.action('pan', self.pan.dx[0], self.pan.dy[0]):
+            self.im_win.setZoom(self.zoom, self.pan.dx[0], self.pan.dy[0])
+
+    def reset_zoom(self):
+        """Shows the complete views again"""
+        self.pan.set(0, 0, 0)
+        self.sbx_zoom.setValue(1)
 
     def reset_all(self):
         """
@@ -419,7 +570,6 @@ class GUIcontrol(QMainWindow):
         displacement, and starts projection.
         Doesn't reset the default display.
         """
-        self.reset_flag = 1  # Ensures simultaneous reset of all displacements
         self.set_defaults()
         self.folder_selection()
 
@@ -432,5 +582,72 @@ class GUIcontrol(QMainWindow):
         err.setWindowTitle("Error")
         err.exec_()
 
+    def show_latency(self):
+        """Shows the input to paint latency in the status bar"""
+        self.statusbar.showMessage(tracer.summary())
+
+    def session_state(self):
+        """Actions restoring the current state at the start of a replay"""
+        return [('folder', [self.film_folder]),
+                ('film_type', [self.img_type]),
+                ('format', [self.img_format]),
+                ('table', [self.xTable, self.yTable, self.wTable,
+                           self.hTable]),
+                ('slide', [str(self.slide_num)]),
+                ('views', [[v.isChecked() for v in self.btn_PV]]),
+                ('displacement', [list(self.displacement.dx),
+                                  list(self.displacement.dy)]),
+                ('zoom', [self.zoom]),
+                ('pan', [self.pan.dx[0], self.pan.dy[0]])]
+
+    def replay_action(self, action, args):
+        """
+        Sets the widgets of a recorded action and calls its handler, like the
+        user or the controller did. Signals are blocked to call it once.
+        """
+        if action == 'folder':
+            self.txt_FolderName.setText(args[0])
+            self.folder_selection()
+        elif action == 'film_type':
+            self.cbx_FilmType.setCurrentText(args[0])
+            self.set_img_type()
+        elif action == 'format':
+            self.cbx_ImgFormat.setCurrentText(args[0])
+            self.set_img_format()
+        elif action == 'table':
+            for widget, value in zip((self.sbx_xtable, self.sbx_ytable,
+                                      self.sbx_wtable, self.sbx_htable), args):
+                widget.blockSignals(True)
+                widget.setValue(value)
+                widget.blockSignals(False)
+            self.set_table()
+        elif action == 'slide':
+            self.cbx_SlideNumber.setCurrentText(args[0])
+            self.get_slide_num()
+        elif action == 'views':
+            for btn, checked in zip(self.btn_PV, args[0]):
+                btn.setChecked(checked)
+            self.enable_projection()
+        elif action == 'displacement':
+            self.displacement.set_all(*args)
+        elif action == 'zoom':
+            self.sbx_zoom.blockSignals(True)
+            self.sbx_zoom.setValue(args[0])
+            self.sbx_zoom.blockSignals(False)
+            self.set_zoom()
+        elif action == 'pan':
+            self.pan.set(0, *args)
+        else:
+            raise ValueError(f'Unknown action {action}')
+
     def closeEvent(self, event):
+        diagnostics.stats(self.im_win.cache.stats())
+        if self.im_win.shared is not None:
+            diagnostics.stats(self.im_win.shared.stats())
+        diagnostics.stats(self.im_win.tiles.cache.stats())
+        diagnostics.stats(self.im_win.scheduler.stats())
+        diagnostics.stats(self.displacement.stats())
+        if tracer.enabled:
+            print(tracer.report())
+        self.im_win.shutdown()
         self.im_win.close()
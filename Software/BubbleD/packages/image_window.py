@@ -5,20 +5,69 @@ Modified: Feb 2022
 Purpose: Loads, scales, translates and rotates the image for projection.
 """
 
-from PyQt5.QtCore import Qt
-from PyQt5.QtGui import QImage, QColor, QPainter, QIcon
+from concurrent.futures import ThreadPoolExecutor
+from PyQt5.QtCore import QRect, QRectF, pyqtSignal
+from PyQt5.QtGui import QColor, QPainter, QIcon, QPixmap
 from PyQt5.QtWidgets import QWidget
 import numpy as np
+from packages.slide_cache import SlideCache, slide_path
+from packages.shared_cache import SharedSlideCache
+from packages.prefetch import SlidePrefetcher
+from packages.render_scheduler import RenderScheduler
+from packages.latency import tracer
+from packages.tile_pyramid import TileStore
+from packages.compositor import Compositor
 
 
 class ImageWindow(QWidget):
     """
     Selected image(s) will be displayed on the projection screen.
     """
+    # Emitted by a background load: (generation, scaled images, table, keys)
+    slidesReady = pyqtSignal(int, object, object, object)
+    # Emitted when a tile pyramid was built in the background
+    tilesReady = pyqtSignal()
+    # Emitted when a slide failed to load: (error, details)
+    loadFailed = pyqtSignal(str, str)
 
-    def __init__(self, icon_path):
+    def __init__(self, icon_path, *, cache_mb=512, prefetch_workers=2,
+                 async_load=False, prescale_dir=None, tile_mb=256,
+                 tile_size=512, blend_mode='over', tints=None,
+                 virtual=None, shared_mb=0, shared_dir=None):
+        # The settings are keyword only, see GUIcontrol
         super().__init__()
         self.setWindowIcon(QIcon(icon_path))
+        self.cache = SlideCache(cache_mb)
+        # Slides shared with the other instances on this PC
+        self.shared = (SharedSlideCache(shared_mb, shared_dir)
+                       if shared_mb > 0 else None)
+        # Output of prescale.py and pack_films.py
+        self.prefetcher = SlidePrefetcher(self.cache, prefetch_workers,
+                                          prescale_dir, virtual, self.shared)
+        self.async_load = async_load
+        self.generation = 0     # Increased with every requested slide
+        self.stale_loads = 0    # Background loads dropped as outdated
+        self.loader = ThreadPoolExecutor(max_workers=1)  # Not behind prefetch
+        self.pending_load = None
+        self.slidesReady.connect(self.showSlides)
+        self.scheduler = RenderScheduler(self)
+        # Tile pyramids for zooming, built on the prefetching threads
+        self.tiles = TileStore(prescale_dir, self.prefetcher.pool, tile_mb,
+                               tile_size)
+        self.tilesReady.connect(self.scheduler.request)
+        self.zoom = 1
+        self.px, self.py = 0, 0     # Panning of the zoomed views
+        self.keys = []          # Cache keys of the projected views
+        # Views combined into one image, unless plainly stacked
+        self.compositor = None
+        if blend_mode != 'over' or any((t != 255).any() for t in tints or []):
+            self.compositor = Compositor(blend_mode, tints)
+        self.sc_img = []
+        self.layers = []        # Display ready (rotated) views
+        self.right = 0          # Right edge of the first view (rotation axis)
+        self.background = None  # Black screen with the white table
+        self.dx, self.dy = np.zeros(3), np.zeros(3)
+        self.tx, self.ty, self.tw, self.th = 0, 0, 0, 0
 
     def selectImage(self, img_folder=("./images/Film 2411_2510"),
                     n_view=3, View=np.empty(3),
@@ -32,47 +81,223 @@ class ImageWindow(QWidget):
                     tw=2160,
                     th=3840,
                     scale=1):
-        """Loads and scales the selected image(s)"""
-        self.sc_img = [None]*n_view
+        """
+        Loads and scales the selected image(s). In asynchronous mode slides
+        missing in the cache are loaded in the background and the previous
+        slide stays projected until all views are ready.
+        """
+        self.generation += 1
         self.Nv = len(View[View > 0])
+        keys = [None]*n_view
         for v, v_value in enumerate(View):
             if v_value > 0:
-                img = (img_folder + '/' + FilmType + '/view_' +
-                       str(v+1) + '/' + str(ImageNo) + '.' + ImgFormat)
-                self.img = QImage(img)
-                self.sc_img[v] = self.img.scaled(int(th*scale), int(tw*scale),
-                                                 Qt.KeepAspectRatio,
-                                                 Qt.SmoothTransformation)
+                keys[v] = (img_folder, FilmType, v+1, ImageNo, ImgFormat,
+                           int(th*scale), int(tw*scale))
         self.dx, self.dy = dx, dy
-        self.tx, self.ty = tx, ty
-        self.tw, self.th = tw, th
-        self.repaint()
+        table = (tx, ty, tw, th)
+        if self.async_load and not all(k is None or k in self.cache
+                                       for k in keys):
+            if self.pending_load is not None:
+                self.pending_load.cancel()
+            loading = {k: self.prefetcher.take(k) for k in keys if k}
+            self.pending_load = self.loader.submit(
+                self.loadSlides, self.generation, keys, loading, table)
+        else:
+            loading = {k: self.prefetcher.take(k) for k in keys if k}
+            self.showSlides(self.generation,
+                            self.getSlides(keys, loading), table, keys)
+
+    def loadSlides(self, generation, keys, loading, table):
+        """Worker: loads all views of a slide and hands them to the GUI"""
+        sc_img = self.getSlides(keys, loading, generation)
+        if sc_img is not None:
+            self.slidesReady.emit(generation, sc_img, table, keys)
+
+    def getSlides(self, keys, loading, generation=None):
+        """
+        Returns the slides of all views. A view whose slide failed to load
+        is left empty and the error is reported with loadFailed. Returns
+        None if a newer slide was requested meanwhile (given generation).
+        """
+        sc_img = []
+        for key in keys:
+            if generation is not None and generation != self.generation:
+                self.stale_loads += 1
+                return None
+            try:
+                sc_img.append(self.getSlide(key, loading.get(key))
+                              if key else None)
+            except Exception as e:
+                sc_img.append(None)
+                self.loadFailed.emit(f'Error: Unable to load '
+                                     f'{slide_path(*key[:5])}',
+                                     f'{type(e).__name__}: {e}')
+        return sc_img
+
+    def showSlides(self, generation, sc_img, table, keys):
+        """Projects a completely loaded slide unless it is outdated"""
+        if generation != self.generation:
+            self.stale_loads += 1
+            return
+        self.sc_img = sc_img
+        self.keys = keys
+        # Nothing is drawn for a view whose slide is missing (null image)
+        self.layers = [QPixmap.fromImage(img)
+                       if img is not None and not img.isNull() else None
+                       for img in sc_img]
+        self.right = next((p.width() for p in self.layers if p), 0)
+        if self.compositor is not None:
+            self.compositor.setViews(sc_img)
+        if table != (self.tx, self.ty, self.tw, self.th):
+            self.tx, self.ty, self.tw, self.th = table
+            self.background = None
+        self.scheduler.request()
+
+    def getSlide(self, key, loading=None):
+        """
+        Returns the scaled slide from the cache, waits for it if it is
+        already being loaded or loads it.
+        """
+        img = self.cache.get(key)
+        if img is None and loading is not None and not loading.cancelled():
+            img = loading.result()
+        if img is None:
+            img = self.prefetcher.load(key)
+        return img
+
+    def shutdown(self):
+        """Stops the background loading"""
+        self.generation += 1
+        self.prefetcher.shutdown()
+        self.loader.shutdown(wait=False)
+
+    def prefetchSlides(self, img_folder, View, FilmType, slides, ImgFormat,
+                       tw=2160, th=3840, scale=1):
+        """Loads the given slides of the active view(s) in the background"""
+        views = [v+1 for v, v_value in enumerate(View) if v_value > 0]
+        self.prefetcher.prefetch(img_folder, FilmType, ImgFormat, views,
+                                 slides, int(th*scale), int(tw*scale))
+
+    def layerRect(self, i_im, dx, dy):
+        """Area of the projection covered by a view"""
+        p_im = self.layers[i_im]
+        return QRect(self.right - int(dx[i_im]) - p_im.width(), int(dy[i_im]),
+                     p_im.width(), p_im.height())
 
     def setDisplacement(self, dx=np.empty(3), dy=np.empty(3)):
-        """Repaints the event with modified displpacement"""
+        """
+        Repaints the event with modified displpacement. Only the area of the
+        moved view(s) before and after moving is repainted.
+        """
+        dirty = QRect()
+        for i_im, p_im in enumerate(self.layers):
+            if p_im is not None and (dx[i_im] != self.dx[i_im] or
+                                     dy[i_im] != self.dy[i_im]):
+                dirty = dirty.united(self.layerRect(i_im, self.dx, self.dy))
+                dirty = dirty.united(self.layerRect(i_im, dx, dy))
         self.dx = dx
         self.dy = dy
-        self.repaint()
+        tracer.stage('view', last=dirty.isNull())
+        if not dirty.isNull():
+            self.scheduler.request(dirty)
+
+    def setZoom(self, zoom=1, px=0, py=0):
+        """
+        Zooms into all views by the factor zoom. The zoomed area is panned by
+        (px, py) pixels of the projection, in the directions of dx and dy.
+        """
+        if (zoom, px, py) != (self.zoom, self.px, self.py):
+            self.zoom, self.px, self.py = zoom, px, py
+            self.scheduler.request()
+
+    def drawZoomed(self, qp, i_im, rect):
+        """
+        Draws the zoomed area of a view from the tiles of the pyramid level
+        closest to the projected resolution. Until the pyramid is built, the
+        scaled view is enlarged instead.
+        """
+        p_im = self.layers[i_im]
+        w, h = p_im.width(), p_im.height()
+        # Visible part of the view, in pixels of the view
+        cw, ch = w/self.zoom, h/self.zoom
+        x0 = min(max(w/2 + self.px/self.zoom - cw/2, 0), w - cw)
+        y0 = min(max(h/2 - self.py/self.zoom - ch/2, 0), h - ch)
+        pyramid = self.tiles.pyramid(self.keys[i_im], self.tilesReady.emit)
+        if pyramid is None:
+            qp.drawPixmap(QRectF(rect), p_im, QRectF(x0, y0, cw, ch))
+            return
+        level = pyramid.level_for(w*self.zoom)
+        lw, lh, _ = pyramid.levels[level]
+        sx, sy = lw/w, lh/h     # Pixels of the level per pixel of the view
+        visible = QRectF(x0*sx, y0*sy, cw*sx, ch*sy)
+        fx, fy = rect.width()/visible.width(), rect.height()/visible.height()
+        t = pyramid.tile
+        for ty in range(int(visible.top())//t, int(visible.bottom())//t + 1):
+            for tx in range(int(visible.left())//t,
+                            int(visible.right())//t + 1):
+                part = visible.intersected(QRectF(tx*t, ty*t, t, t))
+                if part.isEmpty():
+                    continue
+                target = QRectF(
+                    rect.left() + (part.left() - visible.left())*fx,
+                    rect.top() + (part.top() - visible.top())*fy,
+                    part.width()*fx, part.height()*fy)
+                qp.drawImage(target, self.tiles.image(pyramid, level, tx, ty),
+                             part.translated(-tx*t, -ty*t))
 
     def setTable(self, tx=0, ty=600, tw=3840, th=2160):
         """Repaints the images with modified size of
         the table(white) background"""
         self.tx, self.ty = tx, ty
         self.tw, self.th = tw, th
-        self.repaint()
+        self.background = None
+        self.scheduler.request()
+
+    def resizeEvent(self, event):
+        self.background = None
+
+    def drawBackground(self):
+        """Draws the black screen with the white table once"""
+        self.background = QPixmap(self.size())
+        self.background.fill(QColor(0, 0, 0))
+        qp = QPainter(self.background)
+        qp.fillRect(self.tx, self.ty, self.tw, self.th, QColor(255, 255, 255))
+        qp.end()
+        if self.compositor is not None:
+            self.compositor.setBackground(self.width(), self.height(),
+                                          (self.tx, self.ty, self.tw, self.th))
 
     def paintEvent(self, event):
-        """Shows the image(s) in the projection screen"""
+        """
+        Shows the image(s) in the projection screen. The views are already
+        rotated, so they are placed as if the painter was rotated by 90 deg
+        around the right edge of the first view.
+        """
+        if self.background is None:
+            self.drawBackground()
+        area = event.rect()
         qp = QPainter()
         qp.begin(self)
-        qp.fillRect(0, 0, self.width(), self.height(), QColor(0, 0, 0))
-        qp.fillRect(self.tx, self.ty, self.tw, self.th, QColor(255, 255, 255))
-        rotate_counter = 0
-        for i_im, p_im in enumerate(self.sc_img):
-            if isinstance(p_im, QImage):
-                if rotate_counter < 1:
-                    qp.translate(p_im.height(), 0)
-                    qp.rotate(90)
-                    rotate_counter += 1
-                qp.drawImage(self.dy[i_im], self.dx[i_im], p_im)
+        qp.setClipRect(area)
+        if self.compositor is not None and self.zoom == 1:
+            self.compositor.update(area, [
+                self.layerRect(i_im, self.dx, self.dy) if p_im else QRect()
+                for i_im, p_im in enumerate(self.layers)])
+            qp.drawImage(area, self.compositor.image, area)
+            qp.end()
+            tracer.stage('paint')
+            return
+        qp.drawPixmap(area, self.background, area)
+        if self.zoom > 1:
+            qp.setRenderHint(QPainter.SmoothPixmapTransform)
+        for i_im, p_im in enumerate(self.layers):
+            if p_im is not None:
+                rect = self.layerRect(i_im, self.dx, self.dy)
+                if not rect.intersects(area):
+                    continue
+                if self.zoom > 1:
+                    self.drawZoomed(qp, i_im, rect)
+                else:
+                    qp.drawPixmap(rect.topLeft(), p_im)
         qp.end()
+        tracer.stage('paint')
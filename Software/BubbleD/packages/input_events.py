@@ -0,0 +1,75 @@
+"""
+Author: Divya Pal
+Institute: Physikalisches Institut, Universität Bonn
+Modified: Oct 2026
+Purpose: Notifies the gui about changes of the microcontroller inputs,
+instead of polling the inputs with a timer.
+"""
+
+from pyfirmata import ANALOG_MESSAGE, DIGITAL_MESSAGE, SAMPLING_INTERVAL
+from pyfirmata.util import to_two_bytes
+from PyQt5.QtCore import QObject, pyqtSignal
+
+
+def set_sampling_interval(board, interval_ms):
+    """Sets how often the microcontroller reports the analog inputs"""
+    board.send_sysex(SAMPLING_INTERVAL, to_two_bytes(int(interval_ms)))
+
+
+class PinEvents(QObject):
+    """
+    Hooks into the message handling of the board, which runs in the reader
+    (iterator) thread, and emits 'changed' to the gui only when a digital
+    input toggles or an analog input moved by more than its tolerance.
+    """
+    changed = pyqtSignal()
+
+    def __init__(self, board, digital_pins, analog_tol):
+        super().__init__()
+        self.board = board
+        self.digital = {pin: None for pin in digital_pins}
+        self.analog_tol = analog_tol    # Analog pin -> tolerance
+        self.analog = {pin: None for pin in analog_tol}
+        self.messages = 0   # Messages received from the board
+        self.events = 0     # Changes emitted to the gui
+        self.hook(ANALOG_MESSAGE, self.analog_changed)
+        self.hook(DIGITAL_MESSAGE, self.digital_changed)
+
+    def hook(self, cmd, changed):
+        """Runs the check after the board has handled a message"""
+        handler = self.board._command_handlers[cmd]
+
+        def hooked(*data):
+            handler(*data)
+            self.messages += 1
+            if changed(data[0]):
+                self.events += 1
+                self.changed.emit()
+        hooked.bytes_needed = handler.bytes_needed
+        self.board._command_handlers[cmd] = hooked
+
+    def analog_changed(self, pin_nr):
+        if pin_nr not in self.analog:
+            return False
+        value = self.board.analog[pin_nr].value
+        last = self.analog[pin_nr]
+        if value is None or (last is not None and
+                             abs(value - last) <= self.analog_tol[pin_nr]):
+            return False
+        self.analog[pin_nr] = value
+        return True
+
+    def digital_changed(self, port_nr):
+        changed = False
+        for pin in self.digital:
+            if pin // 8 == port_nr:
+                value = self.board.digital[pin].read()
+                if value != self.digital[pin]:
+                    self.digital[pin] = value
+                    changed = True
+        return changed
+
+    def stats(self):
+        """Summary of the received and emitted changes"""
+        return (f'Input events: {self.messages} messages, '
+                f'{self.events} changes')
@@ -0,0 +1,116 @@
+"""
+Author: Divya Pal
+Institute: Physikalisches Institut, Universität Bonn
+Modified: Oct 2026
+Purpose: Filters the joystick and potentiometer inputs to reduce jitter. The
+samples are kept in a ring buffer and converted once per frame into the
+displacement of the moved view.
+"""
+
+import numpy as np
+
+# Order of the analog inputs in the buffer
+JOY_X, JOY_Y, POTI_X, POTI_Y = range(4)
+
+
+class AnalogFilter():
+    """
+    Ring buffer of timestamped samples of the joystick and potentiometers.
+    Per frame the buffered samples are smoothed (exponentially weighted with
+    the time constant filter_tau_ms), a deadband is applied (the joystick
+    centre zone and the potentiometer tolerances as for unfiltered input)
+    and faster movements are accelerated by filter_accel. The resulting
+    displacement is integrated, so that fractions of pixels are not lost.
+    """
+
+    def __init__(self, InputPanel):
+        size = int(InputPanel.get('filter_size', '64'))
+        self.t = np.zeros(size)
+        self.v = np.zeros((4, size))
+        self.n = 0      # Number of samples added
+        self.tau = float(InputPanel.get('filter_tau_ms', '20'))/1000
+        self.frame = float(InputPanel.get('filter_frame_ms', '16'))/1000
+        self.accel = float(InputPanel.get('filter_accel', '0'))
+        self.last_frame = None
+
+        self.centre = np.array([float(InputPanel['joy_midx']),
+                                float(InputPanel['joy_midy']), 0, 0])
+        self.tol = np.array([float(InputPanel['joy_tolx']),
+                             float(InputPanel['joy_toly']),
+                             float(InputPanel['poti_tolx']),
+                             float(InputPanel['poti_toly'])])
+        # Pixels per unit of input, including the polarity
+        sign = {'+': 1, '-': -1}
+        self.gain = np.array([
+            -sign[InputPanel['joy_polx']]*float(InputPanel['joy_stepx']),
+            -sign[InputPanel['joy_poly']]*float(InputPanel['joy_stepy']),
+            sign[InputPanel['poti_polx']]*float(InputPanel['poti_stepx'])
+            / self.tol[POTI_X],
+            sign[InputPanel['poti_poly']]*float(InputPanel['poti_stepy'])
+            / self.tol[POTI_Y]])
+        self.is_joy = np.array([True, True, False, False])
+        self.last = None        # Smoothed values at the last frame
+        self.anchor = None      # Potentiometer values at the last movement
+        self.residual = np.zeros(2)
+
+    def add(self, t, values):
+        """Adds a sample [joy x, joy y, poti x, poti y] taken at time t"""
+        i = self.n % len(self.t)
+        self.t[i] = t
+        self.v[:, i] = values
+        self.n += 1
+
+    def hold(self, t):
+        """Repeats the latest sample at time t, if the input didn't change"""
+        self.add(t, self.v[:, (self.n - 1) % len(self.t)].copy())
+
+    def smoothed(self):
+        """Exponentially weighted mean of the buffered samples"""
+        n = min(self.n, len(self.t))
+        t, v = self.t[:n], self.v[:, :n]
+        w = np.exp(-(t.max() - t)/self.tau) if self.tau > 0 else (
+            t == t.max()).astype(float)
+        return v @ w / w.sum()
+
+    def settled(self):
+        """True if no filtered movement is pending"""
+        if self.n == 0:
+            return True
+        if self.last is None:
+            return False
+        latest = self.v[:, (self.n - 1) % len(self.t)]
+        return bool(np.all(np.abs(latest - self.last) < 1e-4))
+
+    def displacement(self, now):
+        """
+        Returns the (dx, dy) in pixels once per frame, otherwise None. A
+        frame may start a little early, as timers do.
+        """
+        if self.n == 0 or (self.last_frame is not None and
+                           now - self.last_frame < 0.9*self.frame):
+            return None
+        self.last_frame = now
+        s = self.smoothed()
+        if self.last is None:
+            self.last, self.anchor = s, s.copy()
+            return None
+        delta = s - self.last
+        self.last = s
+
+        # Deadband: joystick moves outside of its centre zone and away from
+        # the centre (releasing it doesn't move back), potentiometers once
+        # they moved by more than their tolerance
+        outward = ((np.abs(s - self.centre) > self.tol) &
+                   (np.sign(delta) == np.sign(s - self.centre)))
+        moved = np.abs(s - self.anchor) > self.tol
+        delta = np.where(self.is_joy, np.where(outward, delta, 0),
+                         np.where(moved, s - self.anchor, 0))
+        self.anchor = np.where(~self.is_joy & moved, s, self.anchor)
+
+        # Acceleration of fast movements
+        steps = delta*self.gain*(1 + self.accel*np.abs(delta)/self.tol)
+        self.residual += [steps[JOY_X] + steps[POTI_X],
+                          steps[JOY_Y] + steps[POTI_Y]]
+        move = np.trunc(self.residual)
+        self.residual -= move
+        return int(move[0]), int(move[1])
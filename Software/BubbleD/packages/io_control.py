@@ -10,24 +10,56 @@ import time
 from pyfirmata import Arduino, util, INPUT
 from PyQt5.QtCore import QTimer
 from packages.gui_control import GUIcontrol
+from packages.input_events import PinEvents, set_sampling_interval
+from packages.input_filter import AnalogFilter
+from packages.latency import tracer
+from packages.startup import startup
+from packages.output_shadow import OutputShadow
+from packages.diagnostics import diagnostics
 
 
 class IOcontrol():
-    def __init__(self, port, config):
+    def __init__(self, port, config, trace=None, speed=1.0):
         self.port = port
         self.config = config
+        self.trace = trace  # Replaces the board by a simulation, if given
+        self.speed = speed
         self.Initiate_Microcontroller()
+        startup.mark('controller connection')
         print('Connection established. Starting UI.')
         self.control = GUIcontrol(self.config)
 
         ''' Updates and synchronises external input/output with gui'''
-        self.timerFast = QTimer()
-        self.timerFast.timeout.connect(self.updateInput)
-        self.timerFast.start(1)  # Update rate: 1 ms
+        if self.input_mode == 'event':
+            # Updated when the reader thread reports a changed input
+            self.events.changed.connect(self.updateInput)
+            if self.filter is not None:
+                # Movement still filtered after the last event
+                self.timerFilter = QTimer()
+                self.timerFilter.timeout.connect(self.flush_filter)
+                self.timerFilter.start(max(1, int(self.filter.frame*1000)))
+        else:
+            self.timerFast = QTimer()
+            self.timerFast.timeout.connect(self.updateInput)
+            self.timerFast.start(1)  # Update rate: 1 ms
+        if self.trace is not None:
+            self.board.start_replay()
 
     def updateInput(self):
         self.read_input()
         self.connect_input()
+        self.outputs.flush()
+        tracer.drop()
+
+    def flush_filter(self):
+        """
+        Event mode: applies the filtered movement pending after the last
+        pin event, until the filter settled
+        """
+        if self.filter.settled():
+            return
+        self.filter.hold(time.perf_counter())
+        self.connect_displacement_model()
 
     def Initiate_Microcontroller(self):
         """Initiates required variables and connects to the microcontroller"""
@@ -57,11 +89,22 @@ class IOcontrol():
         self.Poti_xpolarity = self.InputPanel['poti_polx']
         self.Poti_ypolarity = self.InputPanel['poti_poly']
         self.last_buttonclicked = time.time()
+        self.last_read = None   # Inputs of the last cycle (latency tracing)
+        self.input_mode = self.InputPanel.get('input_mode', 'poll')
+        self.filter = None
+        if self.InputPanel.get('filter', 'False') == 'True':
+            self.filter = AnalogFilter(self.InputPanel)
 
         # Connecting the microcontroller
         print('Connecting to microcontroller')
         teensy = self.config['TeensyPins']
-        if self.port is None:
+        Iterator = util.Iterator
+        if self.trace is not None:
+            print('Simulating microcontroller with trace', self.trace)
+            from packages import sim_board
+            self.board = sim_board.SimBoard(self.trace, self.speed)
+            Iterator = sim_board.Iterator
+        elif self.port is None:
             print("Importing port value from config")
             self.board = Arduino(teensy['port'])
         else:
@@ -91,10 +134,12 @@ class IOcontrol():
         self.led = [int(teensy['led1']),
                     int(teensy['led2']),
                     int(teensy['led3'])]
+        self.outputs = OutputShadow(self.board, self.led)
 
         # Switch off all LEDs
         for led in self.led:
-            self.board.digital[led].write(0)
+            self.outputs.write(led, 0)
+        self.outputs.flush()
 
         # Set the input buttons
         for btn_fn in self.mcu_btn_SlideNumber:
@@ -105,13 +150,29 @@ class IOcontrol():
         [joy.enable_reporting() for joy in self.mcu_joy_xy]
         self.mcu_btn_MoveView.mode = INPUT
 
+        if 'sampling_ms' in self.InputPanel:
+            set_sampling_interval(self.board,
+                                  int(self.InputPanel['sampling_ms']))
+        if self.input_mode == 'event':
+            joy_tol = float(self.InputPanel.get('joy_event_tol', '0.01'))
+            self.events = PinEvents(
+                self.board,
+                [int(teensy[pin]) for pin in ('next_slide', 'previous_slide',
+                                              'view1', 'view2', 'view3',
+                                              'select_view')],
+                {int(teensy['poti_x']): self.Poti_xtol,
+                 int(teensy['poti_y']): self.Poti_ytol,
+                 int(teensy['joy_x']): joy_tol,
+                 int(teensy['joy_y']): joy_tol})
+
         ''' Assigning an iterator that will be used to read the status
         of the inputs of the circuit.'''
-        it = util.Iterator(self.board)
+        it = Iterator(self.board)
         it.start()
         time.sleep(1)
-        # Switch off all LEDs at the start
-        self.board.digital[self.led[0]].write(1)
+        # Switch on the LED of the first view at the start
+        self.outputs.write(self.led[0], 1)
+        self.outputs.flush()
 
     def read_input(self):
         "Inputs to read"
@@ -120,6 +181,13 @@ class IOcontrol():
         self.Move = self.mcu_btn_MoveView.read()
         self.Poti = [pot.read() for pot in self.mcu_pot_xy]
         self.Joy = [joy.read() for joy in self.mcu_joy_xy]
+        if tracer.enabled:
+            state = (self.FilmNo, self.Project, self.Move, self.Poti, self.Joy)
+            if state != self.last_read:
+                self.last_read = state
+                tracer.input()
+        if self.filter is not None and None not in (self.Joy + self.Poti):
+            self.filter.add(time.perf_counter(), self.Joy + self.Poti)
         if None in (self.FilmNo or self.Project or
                     self.Move or self.Poti or self.Joy):
             self.control.errorhandling('Error: Micontroller input None',
@@ -146,7 +214,7 @@ class IOcontrol():
                         self.control.btn_PV[i].click()
             if not any(self.Project):
                 for led in self.led:
-                    self.board.digital[led].write(0)
+                    self.outputs.write(led, 0)
         self.last_Project_state = self.Project
 
         # Select the view to be moved
@@ -156,10 +224,32 @@ class IOcontrol():
                 self.last_buttonclicked = time.time()
                 self.MoveView = (self.MoveView+1) % 3
                 for led in self.led:
-                    self.board.digital[led].write(0)
-                self.board.digital[self.led[self.MoveView]].write(1)
+                    self.outputs.write(led, 0)
+                self.outputs.write(self.led[self.MoveView], 1)
         self.last_Move_state = self.Move
 
+        self.connect_displacement_model()
+
+    def connect_displacement_model(self):
+        """
+        Displacement of the selected view, notified once per cycle. When
+        zoomed in, the zoomed area is panned instead.
+        """
+        if self.control.zoom > 1:
+            model, view = self.control.pan, 0
+        else:
+            model, view = self.control.displacement, self.MoveView
+        with model.batch() as disp:
+            if self.filter is None:
+                self.connect_displacement(disp, view)
+            else:
+                move = self.filter.displacement(time.perf_counter())
+                if move is not None:
+                    disp.set(view, dx=disp.dx[view] + move[0],
+                             dy=disp.dy[view] + move[1])
+
+    def connect_displacement(self, disp, view):
+        """Moves the view with the joystick and potentiometers"""
         # Joystick functionality
         # x-movement
         self.Joy_dx = self.Joy[0]-self.last_Joy[0]
@@ -168,14 +258,11 @@ class IOcontrol():
                  (self.Joy_dx < 0) and (
                   self.Joy[0] < (self.centre_Joy[0] - self.Joy_xtol))):
             if self.Joy_xpolarity == '+':
-                self.control.sbx_x[self.MoveView].setValue(
-                    self.control.dx[self.MoveView]
-                    - int(self.Joy_stepX*self.Joy_dx))
+                disp.set(view, dx=disp.dx[view]
+                         - int(self.Joy_stepX*self.Joy_dx))
             elif self.Joy_xpolarity == '-':
-                self.control.sbx_x[self.MoveView].setValue(
-                    self.control.dx[self.MoveView]
-                    + int(self.Joy_stepX*self.Joy_dx))
-            self.control.set_sbx_displacement()
+                disp.set(view, dx=disp.dx[view]
+                         + int(self.Joy_stepX*self.Joy_dx))
 
         # y-movement
         self.Joy_dy = self.Joy[1]-self.last_Joy[1]
@@ -184,14 +271,11 @@ class IOcontrol():
                 (self.Joy_dy < 0) and (
                  self.Joy[1] < (self.centre_Joy[1] - self.Joy_ytol))):
             if self.Joy_ypolarity == '+':
-                self.control.sbx_y[self.MoveView].setValue(
-                    self.control.dy[self.MoveView]
-                    - int(self.Joy_dy*self.Joy_stepY))
+                disp.set(view, dy=disp.dy[view]
+                         - int(self.Joy_dy*self.Joy_stepY))
             elif self.Joy_ypolarity == '-':
-                self.control.sbx_y[self.MoveView].setValue(
-                    self.control.dy[self.MoveView]
-                    + int(self.Joy_dy*self.Joy_stepY))
-            self.control.set_sbx_displacement()
+                disp.set(view, dy=disp.dy[view]
+                         + int(self.Joy_dy*self.Joy_stepY))
 
         self.last_Joy[0] = self.Joy[0]
         self.last_Joy[1] = self.Joy[1]
@@ -203,28 +287,27 @@ class IOcontrol():
                 abs(self.Poti_dy) > self.Poti_ytol):
             # x-movement
             if self.Poti_xpolarity == '+':
-                self.control.sbx_x[self.MoveView].setValue(
-                    self.control.dx[self.MoveView]
-                    + int(self.Poti_dx*self.Poti_stepX/self.Poti_xtol))
+                disp.set(view, dx=disp.dx[view]
+                         + int(self.Poti_dx*self.Poti_stepX/self.Poti_xtol))
             elif self.Poti_xpolarity == '-':
-                self.control.sbx_x[self.MoveView].setValue(
-                    self.control.dx[self.MoveView]
-                    - int(self.Poti_dx*self.Poti_stepX/self.Poti_xtol))
+                disp.set(view, dx=disp.dx[view]
+                         - int(self.Poti_dx*self.Poti_stepX/self.Poti_xtol))
             # y-movement
             if self.Poti_ypolarity == '+':
-                self.control.sbx_y[self.MoveView].setValue(
-                    self.control.dy[self.MoveView]
-                    + int(self.Poti_dy*self.Poti_stepY/self.Poti_xtol))
+                disp.set(view, dy=disp.dy[view]
+                         + int(self.Poti_dy*self.Poti_stepY/self.Poti_xtol))
             elif self.Poti_ypolarity == '-':
-                self.control.sbx_y[self.MoveView].setValue(
-                    self.control.dy[self.MoveView]
-                    - int(self.Poti_dy*self.Poti_stepY/self.Poti_xtol))
+                disp.set(view, dy=disp.dy[view]
+                         - int(self.Poti_dy*self.Poti_stepY/self.Poti_xtol))
 
-            self.control.set_sbx_displacement()
             self.last_Poti[0] = self.Poti[0]
             self.last_Poti[1] = self.Poti[1]
 
     def close(self):
+        if self.input_mode == 'event':
+            diagnostics.stats(self.events.stats())
         for led in self.led:
-            self.board.digital[led].write(0)
+            self.outputs.write(led, 0)
+        self.outputs.flush()
+        diagnostics.stats(self.outputs.stats())
         self.board.exit()
@@ -0,0 +1,102 @@
+"""
+Author: Divya Pal
+Institute: Physikalisches Institut, Universität Bonn
+Modified: Oct 2026
+Purpose: Measures the latency from an input change (controller or control
+window) to the painted projection. Each stage adds the time since the input
+to a histogram, from which the percentiles are summarised.
+"""
+
+import time
+import numpy as np
+
+# Stages in the order they are passed
+STAGES = ('widgets', 'view', 'paint')
+BIN_MS = 0.1        # Resolution of the histograms
+MAX_MS = 1000       # Latencies above are counted in the last bin
+N_BINS = int(MAX_MS/BIN_MS) + 1
+
+
+class LatencyTracer():
+    """
+    Timestamps an input and the stages it passes until the paint of the
+    projection. Disabled, every call returns after checking one attribute,
+    enabled it costs a clock reading and a histogram increment per stage.
+    """
+
+    def __init__(self):
+        self.enabled = False
+        self.histograms = {stage: np.zeros(N_BINS, int)
+                           for stage in STAGES}
+        self.pending = None     # Time of an input not yet handled
+        self.active = None      # Time of the input passing the stages
+        self.dropped = 0        # Inputs which weren't painted
+
+    def enable(self, enabled=True):
+        self.enabled = enabled
+
+    def input(self):
+        """Marks an input change, the earliest unhandled change counts"""
+        if self.enabled and self.pending is None:
+            self.pending = time.perf_counter()
+
+    def drop(self):
+        """Discards an input which didn't reach any stage"""
+        if self.enabled and self.pending is not None:
+            self.pending = None
+            self.dropped += 1
+
+    def stage(self, stage, last=False):
+        """
+        Adds the time since the input to the histogram of the stage. The
+        input is handled after the paint or a stage passed as last.
+        """
+        if not self.enabled:
+            return
+        now = time.perf_counter()
+        if self.pending is not None:
+            # An input which wasn't painted within MAX_MS (e.g. projection
+            # closed) is replaced
+            if self.active is not None and now - self.active > MAX_MS/1000:
+                self.active = None
+                self.dropped += 1
+            if self.active is None:
+                self.active = self.pending
+            self.pending = None
+        if self.active is None:
+            return
+        ms = (now - self.active)*1000
+        self.histograms[stage][min(int(ms/BIN_MS), N_BINS - 1)] += 1
+        if last or stage == STAGES[-1]:
+            self.active = None
+
+    def percentiles(self, stage, q=(50, 95, 99)):
+        """Percentiles of a stage in ms, None without samples"""
+        counts = np.cumsum(self.histograms[stage])
+        if counts[-1] == 0:
+            return None
+        bins = np.searchsorted(counts, np.array(q)/100*counts[-1])
+        return (bins + 1)*BIN_MS
+
+    def summary(self):
+        """One line summary for the status bar"""
+        p = self.percentiles('paint')
+        if p is None:
+            return 'Latency: no input yet'
+        return 'Latency input to paint: p50 {:.1f}, p95 {:.1f}, ' \
+            'p99 {:.1f} ms'.format(*p)
+
+    def report(self):
+        """Percentiles of all stages"""
+        lines = ['Latency since input (ms):   p50     p95     p99       n']
+        for stage in STAGES:
+            p = self.percentiles(stage)
+            if p is not None:
+                lines.append('  {:<20}{:8.1f}{:8.1f}{:8.1f}{:8d}'.format(
+                    stage, *p, self.histograms[stage].sum()))
+        lines.append(f'  {self.dropped} inputs without paint')
+        return '\n'.join(lines)
+
+
+# Shared by the io and gui control and the projection
+tracer = LatencyTracer()
@@ -0,0 +1,42 @@
+"""
+Author: Divya Pal
+Institute: Physikalisches Institut, Universität Bonn
+Modified: Oct 2026
+Purpose: Writes the digital outputs (LEDs) of the microcontroller only when
+their value changes, to keep the serial link free for the inputs.
+"""
+
+
+class OutputShadow():
+    """
+    Keeps a copy of the value of each output pin. Writes are collected and
+    sent once per input cycle by flush(), only for pins whose value differs
+    from the copy. The first write of a pin is always sent.
+    """
+
+    def __init__(self, board, pins):
+        self.board = board
+        self.state = {pin: None for pin in pins}   # Last sent values
+        self.pending = {}   # Pin -> value to send at the next flush
+        self.writes = 0     # Requested writes
+        self.sent = 0       # Writes sent to the board
+
+    def write(self, pin, value):
+        """Sets the value of an output pin at the next flush"""
+        self.writes += 1
+        if value == self.state[pin]:
+            self.pending.pop(pin, None)
+        else:
+            self.pending[pin] = value
+
+    def flush(self):
+        """Sends the changed outputs to the board"""
+        for pin, value in self.pending.items():
+            self.board.digital[pin].write(value)
+            self.state[pin] = value
+            self.sent += 1
+        self.pending.clear()
+
+    def stats(self):
+        """Summary of the requested and sent writes"""
+        return f'Outputs: {self.writes} writes, {self.sent} sent'
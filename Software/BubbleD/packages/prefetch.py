@@ -0,0 +1,90 @@
+"""
+Author: Divya Pal
+Institute: Physikalisches Institut, Universität Bonn
+Modified: Oct 2026
+Purpose: Loads the neighbouring slides in the background, so that stepping
+to the next/previous slide finds it already in the slide cache.
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+from packages.slide_cache import slide_path, prescaled_path, load_slide
+from packages.film_container import ContainerStore
+
+
+class SlidePrefetcher():
+    """
+    Decodes and scales slides on a pool of worker threads and stores them
+    in the slide cache. Queued work is cancelled when the film type,
+    format or target size changes. Slides of virtual film types are
+    computed from the cached slide of their base film type.
+    """
+
+    def __init__(self, cache, workers=2, prescale_dir=None, virtual=None,
+                 shared=None):
+        self.cache = cache
+        self.shared = shared    # Slides of the other instances, or None
+        self.prescale_dir = prescale_dir
+        self.virtual = virtual or {}    # Name -> VirtualFilmType
+        self.containers = ContainerStore(prescale_dir)
+        self.pool = ThreadPoolExecutor(max_workers=workers)
+        self.pending = {}
+        self.settings = None
+
+    def prefetch(self, img_folder, FilmType, ImgFormat, views, slides,
+                 width, height):
+        """
+        Queues the given slides for the given views and cancels the queued
+        ones that are not needed anymore.
+        """
+        settings = (img_folder, FilmType, ImgFormat, width, height)
+        if settings != self.settings:
+            self.cancel()
+            self.settings = settings
+        wanted = [(img_folder, FilmType, view, slide, ImgFormat,
+                   width, height) for slide in slides for view in views]
+        for key in list(self.pending):
+            # Slides that are no longer neighbours are not loaded anymore
+            if key not in wanted or self.pending[key].done():
+                self.pending.pop(key).cancel()
+        for key in wanted:
+            if key not in self.pending and key not in self.cache:
+                self.pending[key] = self.pool.submit(self.load, key)
+
+    def load(self, key):
+        """
+        Loads a slide into the cache, preferring a film container over a
+        slide shared by another instance over a pre-scaled slide over
+        decoding and scaling the original.
+        """
+        virtual = self.virtual.get(key[1])
+        if virtual is not None:
+            base = (key[0], virtual.base) + key[2:]
+            img = self.cache.get(base)
+            img = virtual.apply(img if img is not None else self.load(base))
+            self.cache.put(key, img)
+            return img
+        img = self.containers.image(key)
+        if img is None and self.shared is not None:
+            img = self.shared.get(key)
+        if img is None:
+            img = load_slide(slide_path(*key[:5]), key[5], key[6],
+                             self.prescale_dir and
+                             prescaled_path(self.prescale_dir, *key))
+            if self.shared is not None:
+                img = self.shared.put(key, img)
+        self.cache.put(key, img)
+        return img
+
+    def take(self, key):
+        """Hands over the future of a slide that is being loaded, or None"""
+        return self.pending.pop(key, None)
+
+    def cancel(self):
+        """Cancels all slides that have not started loading"""
+        for future in self.pending.values():
+            future.cancel()
+        self.pending.clear()
+
+    def shutdown(self):
+        self.cancel()
+        self.pool.shutdown(wait=False)
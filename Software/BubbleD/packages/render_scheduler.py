@@ -0,0 +1,65 @@
+"""
+Author: Divya Pal
+Institute: Physikalisches Institut, Universität Bonn
+Modified: Oct 2026
+Purpose: Paces the repainting of the projection to the refresh rate of the
+projector. All changes requested between two frames are painted at once,
+limited to the changed area if only parts of the projection changed.
+"""
+
+import time
+from PyQt5.QtCore import Qt, QObject, QRect, QTimer
+
+
+class RenderScheduler(QObject):
+    """
+    Merges repaint requests into at most one paint per frame of the screen.
+    """
+
+    def __init__(self, widget, refresh_rate=60):
+        super().__init__(widget)
+        self.widget = widget
+        self.timer = QTimer(self)
+        self.timer.setSingleShot(True)
+        self.timer.setTimerType(Qt.PreciseTimer)
+        self.timer.timeout.connect(self.render)
+        self.setRefreshRate(refresh_rate)
+        self.last_frame = 0
+        self.dirty = QRect()  # Area of the pending frame, null: everything
+        self.requests = 0   # Requested repaints
+        self.frames = 0     # Painted frames
+        self.merged = 0     # Requests painted with an earlier request
+
+    def setRefreshRate(self, refresh_rate):
+        """Sets the frame interval from the refresh rate in Hz"""
+        self.interval = 1/refresh_rate if refresh_rate > 0 else 1/60
+
+    def request(self, rect=None):
+        """Schedules a repaint of rect (default: everything) for the next
+        frame"""
+        self.requests += 1
+        pending = self.timer.isActive()
+        if rect is None or (pending and self.dirty.isNull()):
+            self.dirty = QRect()
+        else:
+            self.dirty = self.dirty.united(rect)
+        if pending:
+            self.merged += 1
+            return
+        wait = self.interval - (time.perf_counter() - self.last_frame)
+        self.timer.start(max(0, int(wait*1000)))
+
+    def render(self):
+        """Paints the frame"""
+        self.last_frame = time.perf_counter()
+        self.frames += 1
+        if self.dirty.isNull():
+            self.widget.repaint()
+        else:
+            self.widget.repaint(self.dirty)
+            self.dirty = QRect()
+
+    def stats(self):
+        """Summary of the painted frames"""
+        return (f'Render: {self.requests} requests, {self.frames} frames, '
+                f'{self.merged} merged at {1/self.interval:.0f} Hz')
@@ -0,0 +1,74 @@
+"""
+Author: Divya Pal
+Institute: Physikalisches Institut, Universität Bonn
+Modified: Oct 2026
+Purpose: Records the actions handled by the gui (folder, film type, slide,
+views, table, displacement, zoom) with their time, so that a session at the
+table can be replayed with replay_session.py to reproduce or benchmark it.
+"""
+
+import csv
+import json
+import time
+from contextlib import contextmanager
+
+
+def read_session(path):
+    """Reads a session as a list of (time, action, arguments, ms)"""
+    with open(path, newline='') as f:
+        return [(float(t), action, json.loads(args),
+                 float(ms) if ms else None)
+                for t, action, args, ms in csv.reader(f)
+                if not t.startswith('#')]
+
+
+class SessionRecorder():
+    """
+    Writes each action to the session file when its handler returns, with
+    the time since the start and the time to handle it. Actions handled
+    within another action are part of it and not written. Nothing is
+    written unless the recording was started.
+    """
+
+    def __init__(self):
+        self.file = None
+        self.writer = None
+        self.start_time = 0
+        self.depth = 0
+
+    def start(self, path, state):
+        """
+        Starts writing the session to path, beginning with the actions
+        restoring the current state, as list of (action, arguments).
+        """
+        self.file = open(path, 'w', newline='')
+        self.file.write('# time,action,arguments,ms\n')
+        self.writer = csv.writer(self.file)
+        for action, args in state:
+            self.writer.writerow((0, action, json.dumps(args), ''))
+        self.file.flush()
+        self.start_time = time.perf_counter()
+
+    def stop(self):
+        if self.file is not None:
+            self.file.close()
+            self.file = None
+
+    @contextmanager
+    def action(self, name, *args):
+        """Records the handling of an action with its arguments"""
+        self.depth += 1
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.depth -= 1
+            if self.file is not None and self.depth == 0:
+                self.writer.writerow(
+                    (f'{start - self.start_time:.4f}', name, json.dumps(args),
+                     f'{(time.perf_counter() - start)*1000:.2f}'))
+                self.file.flush()
+
+
+# Started by main.py -rec
+session = SessionRecorder()
@@ -30,11 +30,57 @@ parser.add_argument("-t", "--table", choices=('1', '2'),
                     help="Choose table to load config file"
                     )
 
+parser.add_argument("-sim", "--simulate",
+                    help="Replay a recorded input trace (see record_input.py) "
+                    "instead of connecting the external controller"
+                    )
+
+parser.add_argument("-s", "--speed", type=float,
+                    default=1.0,
+                    help="Replay speed of the input trace"
+                    )
+
+parser.add_argument("-l", "--latency", action='store_true',
+                    help="Trace the latency from input to projection"
+                    )
+
+parser.add_argument("-rec", "--record",
+                    help="Record the handled actions to a session file, see "
+                    "replay_session.py"
+                    )
+
+parser.add_argument("-prof", "--profile", choices=('cprofile', 'sample'),
+                    help="Profile the event loop, deterministic or by "
+                    "sampling the call stack"
+                    )
+
+parser.add_argument("-mem", "--memory", action='store_true',
+                    help="Trace the memory allocated when loading and "
+                    "painting slides"
+                    )
+
+parser.add_argument("-tm", "--timing", action='store_true',
+                    help="Measure the time spent in each subsystem"
+                    )
+
+parser.add_argument("-dd", "--diag-dir",
+                    default='.',
+                    help="Folder to write the profile, memory and timing "
+                    "reports to"
+                    )
+
+parser.add_argument("-v", "--verbose", action='store_true',
+                    help="Print the statistics of the caches, rendering and "
+                    "inputs on exit"
+                    )
+
 parser.add_argument("-cfg", "--config",
                     default='.',
                     help="Insert directory to read/write config_table1.ini or "
                     "config_table2.ini"
                     )
 
-# importing the provided arguments
-args = parser.parse_args()
+
+def parse_args(argv=None):
+    '''Parses the provided arguments (default: command line)'''
+    return parser.parse_args(argv)
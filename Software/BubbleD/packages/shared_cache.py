@@ -0,0 +1,153 @@
+"""
+Author: Divya Pal
+Institute: Physikalisches Institut, Universität Bonn
+Modified: Oct 2026
+Purpose: Slide cache shared by the instances of the software on one PC (e.g.
+one per table), so that a slide decoded and scaled by one instance is used
+by the other one without decoding it again or holding a second copy.
+
+Each slide is a file in a memory backed folder (/dev/shm on Linux), mapped
+by every instance using it (little endian):
+    header  magic b'BUBS', version, width, height, bytes per line, format
+    pixels  from offset 64
+A file is written under a temporary name and renamed when complete. Evicted
+files are deleted; an instance still showing the slide keeps its mapping,
+and the memory is freed with the last mapping (counted by the system).
+"""
+
+import os
+import mmap
+import struct
+import hashlib
+import tempfile
+import threading
+from PyQt5.QtGui import QImage
+from packages.slide_cache import slide_path
+
+MAGIC = b'BUBS'
+VERSION = 1
+HEADER = struct.Struct('<4sIIIII')
+OFFSET = 64
+
+
+def default_folder():
+    """Memory backed folder if the system has one"""
+    root = '/dev/shm' if os.path.isdir('/dev/shm') else tempfile.gettempdir()
+    return os.path.join(root, 'bubbled')
+
+
+class SharedSlideCache():
+    """
+    Least recently used cache of scaled slides with a memory budget, shared
+    between processes through mapped files. Slides are keyed like the slide
+    cache, with the absolute film folder, so that the instances find each
+    other's slides. Using a slide marks it as recently used for all
+    instances.
+    """
+
+    def __init__(self, max_mb=1024, folder=None):
+        self.folder = folder or default_folder()
+        os.makedirs(self.folder, exist_ok=True)
+        self.max_bytes = int(max_mb * 1024 * 1024)
+        self.hits = 0
+        self.misses = 0
+        self.shared = 0     # Slides written for the other instances
+
+    def path(self, key):
+        """File of a slide cache key"""
+        img_folder, *rest = key
+        name = repr((os.path.abspath(img_folder), *rest))
+        return os.path.join(self.folder,
+                            hashlib.sha1(name.encode()).hexdigest() + '.bss')
+
+    def get(self, key):
+        """
+        Returns the slide using the mapped pixels, or None if no instance
+        stored it or it is older than the slide.
+        """
+        path = self.path(key)
+        try:
+            outdated = os.path.getmtime(path) < os.path.getmtime(
+                slide_path(*key[:5]))
+        except OSError:
+            outdated = True
+        img = None if outdated else self.map(path)
+        if img is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+            try:
+                os.utime(path)  # Recently used
+            except OSError:
+                pass
+        return img
+
+    def map(self, path):
+        """QImage using the mapped pixels of a slide file, or None"""
+        try:
+            with open(path, 'rb') as f:
+                data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except (OSError, ValueError):
+            return None
+        magic, version, width, height, bpl, fmt = HEADER.unpack_from(data, 0)
+        if (magic != MAGIC or version != VERSION or
+                len(data) < OFFSET + bpl*height):
+            return None
+        return QImage(memoryview(data)[OFFSET:OFFSET + bpl*height],
+                      width, height, bpl, QImage.Format(fmt))
+
+    def put(self, key, img):
+        """
+        Stores a slide for the other instances and evicts the least recently
+        used slides. Returns the stored slide, or img if it can't be stored.
+        """
+        size = OFFSET + img.sizeInBytes()
+        if size > self.max_bytes:
+            return img
+        path = self.path(key)
+        tmp = f'{path}.{os.getpid()}.{threading.get_ident()}.tmp'
+        try:
+            with open(tmp, 'wb') as f:
+                f.write(HEADER.pack(MAGIC, VERSION, img.width(), img.height(),
+                                    img.bytesPerLine(), img.format()))
+                f.write(b'\0' * (OFFSET - HEADER.size))
+                f.write(img.constBits().asstring(img.sizeInBytes()))
+            os.replace(tmp, path)
+        except OSError:
+            return img
+        self.shared += 1
+        self.evict()
+        shared = self.map(path)
+        return img if shared is None else shared
+
+    def entries(self):
+        """(last use, size, path) of the stored slides"""
+        entries = []
+        for entry in os.scandir(self.folder):
+            if entry.name.endswith('.bss'):
+                try:
+                    stat = entry.stat()
+                except OSError:
+                    continue    # Evicted by another instance
+                entries.append((stat.st_mtime, stat.st_size, entry.path))
+        return entries
+
+    def evict(self):
+        """Deletes the least recently used slides above the budget"""
+        entries = sorted(self.entries())
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in entries:
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                pass    # Already evicted, or still mapped on Windows
+            total -= size
+
+    def stats(self):
+        """Summary of the cache usage"""
+        entries = self.entries()
+        return (f'Shared cache: {self.hits} hits, {self.misses} misses, '
+                f'{self.shared} shared, {len(entries)} images, '
+                f'{sum(e[1] for e in entries)/(1024*1024):.1f} MB')
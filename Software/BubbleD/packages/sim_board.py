@@ -0,0 +1,139 @@
+"""
+Author: Divya Pal
+Institute: Physikalisches Institut, Universität Bonn
+Modified: Oct 2026
+Purpose: Simulates the microcontroller board (pyfirmata.Arduino) by replaying
+a recorded input trace, so that the software can be run and benchmarked
+without the external controller. Traces are recorded with record_input.py.
+
+Trace format (csv): time in s, 'a'nalog or 'd'igital, pin number, value
+"""
+
+import csv
+import time
+import threading
+from pyfirmata import ANALOG_MESSAGE, DIGITAL_MESSAGE
+
+
+def read_trace(path):
+    """Reads a trace as a list of (time, kind, pin, value)"""
+    with open(path, newline='') as f:
+        return [(float(t), kind, int(pin), float(value))
+                for t, kind, pin, value in csv.reader(f)
+                if not t.startswith('#')]
+
+
+def write_trace(path, trace):
+    """Writes a list of (time, kind, pin, value) as trace"""
+    with open(path, 'w', newline='') as f:
+        f.write('# time,kind,pin,value\n')
+        csv.writer(f).writerows(trace)
+
+
+class SimPin():
+    """Pin with the interface of pyfirmata.Pin"""
+
+    def __init__(self, board, pin_number, analog=False):
+        self.board = board
+        self.pin_number = pin_number
+        self.analog = analog
+        self.mode = None
+        self.reporting = False
+        self.value = None if analog else False
+
+    def enable_reporting(self):
+        self.reporting = True
+
+    def disable_reporting(self):
+        self.reporting = False
+
+    def read(self):
+        return self.value
+
+    def write(self, value):
+        self.value = value
+        self.board.writes += 1
+
+
+class SimBoard():
+    """
+    Board with the interface of pyfirmata.Arduino. The input values are
+    set by replaying the trace through the same message handlers as the
+    real board, so that handlers hooked by PinEvents are called as well.
+    """
+
+    def __init__(self, trace, speed=1.0, n_digital=42, n_analog=18):
+        self.trace = read_trace(trace) if isinstance(trace, str) else trace
+        self.speed = speed
+        self.digital = [SimPin(self, i) for i in range(n_digital)]
+        self.analog = [SimPin(self, i, analog=True) for i in range(n_analog)]
+        self.writes = 0     # Writes to output pins
+        self.running = True
+        self.started = threading.Event()
+        self._command_handlers = {ANALOG_MESSAGE: self._handle_analog,
+                                  DIGITAL_MESSAGE: self._handle_digital}
+
+    def _handle_analog(self, pin_nr, lsb, msb):
+        if self.analog[pin_nr].reporting:
+            self.analog[pin_nr].value = round(((msb << 7) + lsb)/1023, 4)
+    _handle_analog.bytes_needed = 3
+
+    def _handle_digital(self, port_nr, lsb, msb):
+        mask = (msb << 7) + lsb
+        for pin in self.digital[port_nr*8:port_nr*8 + 8]:
+            pin.value = (mask & (1 << (pin.pin_number % 8))) > 0
+    _handle_digital.bytes_needed = 3
+
+    def apply(self, kind, pin, value):
+        """Sends an input change as Firmata message to the handlers"""
+        if kind == 'a':
+            raw = int(round(value*1023))
+            self._command_handlers[ANALOG_MESSAGE](pin, raw & 0x7F, raw >> 7)
+        else:
+            port = pin // 8
+            mask = sum(1 << (p.pin_number % 8) for p in
+                       self.digital[port*8:port*8 + 8]
+                       if (p.value if p.pin_number != pin else value))
+            self._command_handlers[DIGITAL_MESSAGE](port, mask & 0x7F,
+                                                    mask >> 7)
+
+    def start_replay(self):
+        """Starts replaying the trace after the initial values (time 0)"""
+        self.started.set()
+
+    def replay(self):
+        """Replays the trace in (speed times) real time"""
+        for t, kind, pin, value in self.trace:
+            if t <= 0:
+                self.apply(kind, pin, value)
+        self.started.wait()
+        start = time.perf_counter()
+        for t, kind, pin, value in self.trace:
+            if not self.running:
+                return
+            if t <= 0:
+                continue
+            wait = t/self.speed - (time.perf_counter() - start)
+            if wait > 0:
+                time.sleep(wait)
+            self.apply(kind, pin, value)
+        print(f'Trace replayed in {time.perf_counter() - start:.1f} s')
+
+    def send_sysex(self, sysex_cmd, data=[]):
+        pass
+
+    def exit(self):
+        self.running = False
+        self.started.set()
+
+
+class Iterator(threading.Thread):
+    """Replays the trace of a SimBoard, like pyfirmata.util.Iterator"""
+
+    def __init__(self, board):
+        super().__init__()
+        self.board = board
+        self.daemon = True
+
+    def run(self):
+        self.board.replay()
@@ -0,0 +1,104 @@
+"""
+Author: Divya Pal
+Institute: Physikalisches Institut, Universität Bonn
+Modified: Oct 2026
+Purpose: Keeps recently decoded and scaled slides in memory, so that going
+back to a slide does not decode and scale the image again.
+"""
+
+import os
+import threading
+from collections import OrderedDict
+from PyQt5.QtCore import Qt
+from PyQt5.QtGui import QImage, QTransform
+
+
+def slide_path(img_folder, FilmType, view, ImageNo, ImgFormat):
+    """Builds the path of a slide in the image folder structure"""
+    return (img_folder + '/' + FilmType + '/view_' + str(view) + '/' +
+            str(ImageNo) + '.' + ImgFormat)
+
+
+def prescaled_path(prescale_dir, img_folder, FilmType, view, ImageNo,
+                   ImgFormat, width, height):
+    """Path of a slide pre-scaled to width x height and rotated by
+    prescale.py. It is stored losslessly as png, whatever the format of the
+    slide."""
+    return os.path.join(prescale_dir,
+                        os.path.basename(os.path.normpath(img_folder)),
+                        FilmType, 'view_' + str(view),
+                        f'{width}x{height}', f'{ImageNo}.{ImgFormat}.png')
+
+
+def load_slide(path, width, height, prescaled=None):
+    """
+    Decodes a slide, scales it to the projected size and rotates it for the
+    projection. A pre-scaled copy is loaded instead if it exists and is not
+    older than the slide.
+    """
+    if prescaled and os.path.isfile(prescaled) and (
+            os.path.getmtime(prescaled) >= os.path.getmtime(path)):
+        img = QImage(prescaled)
+    else:
+        img = QImage(path).scaled(width, height, Qt.KeepAspectRatio,
+                                  Qt.SmoothTransformation).transformed(
+                                      QTransform().rotate(90))
+    return img.convertToFormat(QImage.Format_ARGB32_Premultiplied)
+
+
+class SlideCache():
+    """
+    Least recently used cache of scaled slides with a memory budget.
+    Slides are keyed by (film folder, film type, view, slide number,
+    format, width, height), the size being derived from the image scale.
+    """
+
+    def __init__(self, max_mb=512, name='Slide cache'):
+        self.name = name
+        self.max_bytes = int(max_mb * 1024 * 1024)
+        self.cur_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.slides = OrderedDict()
+        self.lock = threading.Lock()  # Slides are also added by prefetching
+
+    def __contains__(self, key):
+        with self.lock:
+            return key in self.slides
+
+    def get(self, key):
+        """Returns the cached slide or None and counts the hit/miss"""
+        with self.lock:
+            img = self.slides.get(key)
+            if img is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+                self.slides.move_to_end(key)
+            return img
+
+    def put(self, key, img):
+        """Stores a slide and evicts the least recently used ones"""
+        size = img.sizeInBytes()
+        if size > self.max_bytes:
+            return
+        with self.lock:
+            if key in self.slides:
+                self.cur_bytes -= self.slides.pop(key).sizeInBytes()
+            self.slides[key] = img
+            self.cur_bytes += size
+            while self.cur_bytes > self.max_bytes:
+                _, old = self.slides.popitem(last=False)
+                self.cur_bytes -= old.sizeInBytes()
+
+    def clear(self):
+        """Empties the cache"""
+        with self.lock:
+            self.slides.clear()
+            self.cur_bytes = 0
+
+    def stats(self):
+        """Summary of the cache usage"""
+        return (f'{self.name}: {self.hits} hits, {self.misses} misses, '
+                f'{len(self.slides)} images, '
+                f'{self.cur_bytes/(1024*1024):.1f} MB')
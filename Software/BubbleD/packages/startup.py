@@ -0,0 +1,33 @@
+"""
+Author: Divya Pal
+Institute: Physikalisches Institut, Universität Bonn
+Modified: Oct 2026
+Purpose: Measures the time of the phases of the start of the software, from
+the imports until the gui is shown.
+"""
+
+import time
+
+
+class StartupTimer():
+    """Time of each phase since the end of the previous phase"""
+
+    def __init__(self):
+        self.start = self.last = time.perf_counter()
+        self.phases = []
+
+    def mark(self, phase):
+        """Ends a phase"""
+        now = time.perf_counter()
+        self.phases.append((phase, now - self.last))
+        self.last = now
+
+    def report(self):
+        lines = ['Startup time:']
+        lines += [f'  {phase:<24}{t*1000:8.1f} ms' for phase, t in self.phases]
+        lines.append(f'  {"total":<24}{(self.last - self.start)*1000:8.1f} ms')
+        return '\n'.join(lines)
+
+
+# Started with the first import, by main.py
+startup = StartupTimer()
@@ -0,0 +1,174 @@
+"""
+Author: Divya Pal
+Institute: Physikalisches Institut, Universität Bonn
+Modified: Oct 2026
+Purpose: Multi-resolution tile pyramids of slides for zooming into the
+projection. A pyramid holds a slide rotated for the projection at full
+resolution and halved until it fits into one tile, cut into square tiles of
+uncompressed pixels. It is memory-mapped, so that only the tiles of the
+visible region are read from disk.
+
+Layout of a pyramid (little endian):
+    header  magic b'BUBT', version, tile size, number of levels
+    levels  per level: width, height, offset of the first tile
+    tiles   per level row by row, each tile size x tile size ARGB32
+            (premultiplied) pixels, padded with transparent pixels
+"""
+
+import os
+import mmap
+import struct
+import threading
+from PyQt5.QtCore import Qt, QRect
+from PyQt5.QtGui import QImage, QTransform
+from packages.slide_cache import SlideCache, slide_path
+
+MAGIC = b'BUBT'
+VERSION = 1
+HEADER = struct.Struct('<4sIII')
+LEVEL = struct.Struct('<IIQ')
+PAGE = mmap.ALLOCATIONGRANULARITY
+FORMAT = QImage.Format_ARGB32_Premultiplied
+
+
+def pyramid_path(prescale_dir, img_folder, FilmType, view, ImageNo,
+                 ImgFormat):
+    """Path of the tile pyramid of a slide in the given image format"""
+    return os.path.join(prescale_dir, 'tiles',
+                        os.path.basename(os.path.normpath(img_folder)),
+                        FilmType, f'view_{view}', f'{ImageNo}.{ImgFormat}.bpt')
+
+
+def level_sizes(width, height, tile):
+    """Sizes of the levels, halved until a level fits into one tile"""
+    sizes = [(width, height)]
+    while max(width, height) > tile:
+        width, height = max(1, (width + 1)//2), max(1, (height + 1)//2)
+        sizes.append((width, height))
+    return sizes
+
+
+def build_pyramid(src, path, tile=512):
+    """
+    Decodes a slide once, rotates it for the projection and writes its
+    pyramid. Returns False if the slide can't be read.
+    """
+    img = QImage(src)
+    if img.isNull():
+        return False
+    img = img.transformed(QTransform().rotate(90)).convertToFormat(FORMAT)
+    sizes = level_sizes(img.width(), img.height(), tile)
+    tmp = path + '.tmp'
+    head = HEADER.size + LEVEL.size*len(sizes)
+    offset = head + -head % PAGE
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(tmp, 'wb') as f:
+        f.write(HEADER.pack(MAGIC, VERSION, tile, len(sizes)))
+        for width, height in sizes:
+            f.write(LEVEL.pack(width, height, offset))
+            offset += (-(-width//tile))*(-(-height//tile))*tile*tile*4
+        f.write(b'\0' * (-f.tell() % PAGE))
+        for level, (width, height) in enumerate(sizes):
+            if level:
+                img = img.scaled(width, height, Qt.IgnoreAspectRatio,
+                                 Qt.SmoothTransformation)
+            for y in range(0, height, tile):
+                for x in range(0, width, tile):
+                    part = img.copy(QRect(x, y, tile, tile))
+                    f.write(part.constBits().asstring(part.sizeInBytes()))
+    os.replace(tmp, path)
+    return True
+
+
+class TilePyramid():
+    """Memory-mapped pyramid giving the tiles as QImage without copy"""
+
+    def __init__(self, path):
+        self.path = path
+        with open(path, 'rb') as f:
+            self.data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, self.tile, n_levels = HEADER.unpack_from(self.data, 0)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f'{path} is not a tile pyramid')
+        self.levels = [LEVEL.unpack_from(self.data,
+                                         HEADER.size + i*LEVEL.size)
+                       for i in range(n_levels)]
+
+    def level_for(self, width):
+        """Smallest level at least width pixels wide (else full size)"""
+        for level in range(len(self.levels) - 1, -1, -1):
+            if self.levels[level][0] >= width:
+                return level
+        return 0
+
+    def image(self, level, tx, ty):
+        """QImage using the mapped pixels of a tile"""
+        width, height, offset = self.levels[level]
+        size = self.tile*self.tile*4
+        offset += (ty*(-(-width//self.tile)) + tx)*size
+        return QImage(memoryview(self.data)[offset:offset + size],
+                      self.tile, self.tile, self.tile*4, FORMAT)
+
+
+class TileStore():
+    """
+    Opens the pyramids of the projected slides, builds missing ones on the
+    given thread pool and keeps the recently drawn tiles in a least recently
+    used cache.
+    """
+
+    def __init__(self, prescale_dir, pool, cache_mb=256, tile=512):
+        self.prescale_dir = prescale_dir
+        self.pool = pool
+        self.tile = tile
+        self.cache = SlideCache(cache_mb, 'Tile cache')
+        self.pyramids = {}
+        self.building = {}
+        self.lock = threading.Lock()
+
+    def pyramid(self, key, built=None):
+        """
+        Returns the pyramid of a slide cache key. If it doesn't exist or is
+        older than the slide, it is built in the background, calling built()
+        when done, and None is returned.
+        """
+        if not self.prescale_dir:
+            return None
+        src = slide_path(*key[:5])
+        path = pyramid_path(self.prescale_dir, *key[:5])
+        with self.lock:
+            if path in self.pyramids:
+                return self.pyramids[path]
+            if path in self.building:
+                return None
+            try:
+                if os.path.getmtime(path) >= os.path.getmtime(src):
+                    self.pyramids[path] = TilePyramid(path)
+                    return self.pyramids[path]
+            except (OSError, ValueError):
+                pass
+            self.building[path] = self.pool.submit(self.build, src, path,
+                                                   built)
+        return None
+
+    def build(self, src, path, built):
+        """Worker: builds a pyramid and opens it"""
+        try:
+            pyramid = TilePyramid(path) if build_pyramid(
+                src, path, self.tile) else None
+        except (OSError, ValueError):
+            pyramid = None
+        with self.lock:
+            self.pyramids[path] = pyramid
+            del self.building[path]
+        if built is not None:
+            built()
+
+    def image(self, pyramid, level, tx, ty):
+        """Tile from the cache, or read from the pyramid and cached"""
+        key = (pyramid.path, level, tx, ty)
+        img = self.cache.get(key)
+        if img is None:
+            img = pyramid.image(level, tx, ty).copy()
+            self.cache.put(key, img)
+        return img
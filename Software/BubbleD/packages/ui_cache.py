@@ -0,0 +1,52 @@
+"""
+Author: Divya Pal
+Institute: Physikalisches Institut, Universität Bonn
+Modified: Oct 2026
+Purpose: Loads the gui layout from a python module compiled from the .ui file,
+instead of parsing the .ui file at every start. The module is compiled again
+only when the .ui file changed.
+"""
+
+import os
+import importlib.util
+
+
+def compiled_path(ui_path):
+    """Path of the compiled layout, next to the .ui file"""
+    return os.path.splitext(ui_path)[0] + '_ui.py'
+
+
+def compile_ui(ui_path, py_path):
+    """Compiles the .ui file into a python module"""
+    from PyQt5 import uic
+    tmp = py_path + '.tmp'
+    with open(ui_path) as ui_file, open(tmp, 'w') as py_file:
+        uic.compileUi(ui_file, py_file)
+    os.replace(tmp, py_path)
+
+
+def load_ui(ui_path, widget):
+    """
+    Sets up the layout of the .ui file on the widget, with the child widgets
+    as attributes of the widget (as uic.loadUi). Falls back to uic.loadUi if
+    the compiled module can't be written.
+    """
+    py_path = compiled_path(ui_path)
+    if not os.path.isfile(py_path) or (
+            os.path.getmtime(py_path) < os.path.getmtime(ui_path)):
+        try:
+            compile_ui(ui_path, py_path)
+        except OSError:
+            from PyQt5 import uic
+            uic.loadUi(ui_path, widget)
+            return
+    name = os.path.splitext(os.path.basename(py_path))[0]
+    spec = importlib.util.spec_from_file_location(name, py_path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    ui_class = next(getattr(module, attr) for attr in dir(module)
+                    if attr.startswith('Ui_'))
+    ui = ui_class()
+    ui.setupUi(widget)
+    for attr, child in vars(ui).items():
+        setattr(widget, attr, child)
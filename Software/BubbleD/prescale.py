@@ -0,0 +1,88 @@
+"""
+Author: Divya Pal
+Institute: Physikalisches Institut, Universität Bonn
+Modified: Oct 2026
+Purpose: Pre-scales and rotates all slides to the projected size of a table,
+so that the projection loads them without scaling. Only slides whose source
+changed or which are missing for the target size are scaled again.
+"""
+
+import os
+import time
+import argparse
+from configparser import ConfigParser
+from multiprocessing import Pool
+from packages.slide_cache import slide_path, prescaled_path, load_slide
+from packages.archive_index import film_slides
+
+
+def target_size(config):
+    """Size of the projected slides for the default table settings"""
+    ctrl = config['GUIParamters']
+    proj_dim = list(map(int, ctrl['proj_display'].split('x')))
+    scale = float(ctrl['image_scale'])
+    return int(int(ctrl['table_stop'])*scale), int(proj_dim[0]*scale)
+
+
+def find_slides(img_root, prescale_dir, width, height):
+    """Lists (source, target) of the slides which have to be scaled"""
+    todo = []
+    for slide in film_slides(img_root):
+        src = slide_path(*slide)
+        dst = prescaled_path(prescale_dir, *slide, width, height)
+        if not os.path.isfile(dst) or (
+                os.path.getmtime(dst) < os.path.getmtime(src)):
+            todo.append((src, dst))
+    return todo
+
+
+def scale_slide(task):
+    """Worker: scales one slide and writes it atomically"""
+    src, dst, width, height = task
+    os.makedirs(os.path.dirname(dst), exist_ok=True)
+    tmp = dst + '.tmp'
+    if not load_slide(src, width, height).save(
+            tmp, os.path.splitext(dst)[1][1:].upper()):
+        return src, False
+    os.replace(tmp, dst)
+    return src, True
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument("-cfg", "--config",
+                        default='./config_table1.ini',
+                        help="Config file defining the projected size"
+                        )
+    parser.add_argument("-i", "--images",
+                        default='./images',
+                        help="Folder containing the Film xxxx_yyyy folders"
+                        )
+    parser.add_argument("-o", "--output",
+                        help="Folder for the pre-scaled slides "
+                        "(default: prescaled path of the config file)"
+                        )
+    parser.add_argument("-j", "--jobs", type=int,
+                        default=os.cpu_count(),
+                        help="Number of processes"
+                        )
+    args = parser.parse_args()
+
+    config = ConfigParser()
+    with open(args.config) as config_file:
+        config.read_file(config_file)
+    prescale_dir = args.output or config['Paths'].get('prescaled',
+                                                      './prescaled')
+    width, height = target_size(config)
+
+    todo = find_slides(args.images, prescale_dir, width, height)
+    print(f'{len(todo)} slides to scale to {width}x{height} in '
+          f'{prescale_dir}')
+    start = time.time()
+    with Pool(args.jobs) as pool:
+        for i, (src, ok) in enumerate(pool.imap_unordered(
+                scale_slide, [(s, d, width, height) for s, d in todo])):
+            if not ok:
+                print('Unable to scale', src)
+            print(f'{i+1}/{len(todo)}', end='\r')
+    print(f'Done in {time.time()-start:.1f} s')
@@ -0,0 +1,206 @@
+"""
+Author: Divya Pal
+Institute: Physikalisches Institut, Universität Bonn
+Modified: Oct 2026
+Purpose: Generates a film type from another one, e.g. a thresholded film
+from the Default film, by applying a pipeline of image operations to every
+slide with a pool of processes. Each slide is read, processed and written by
+one worker, so a film is never held in memory. Slides already processed
+with the same pipeline are skipped, so an interrupted run can be continued.
+"""
+
+import os
+import time
+import shutil
+import argparse
+import numpy as np
+from multiprocessing import Pool
+from PyQt5.QtCore import Qt
+from PyQt5.QtGui import QImage
+
+PIPELINE_FILE = 'pipeline.txt'  # Pipeline of the generated film type
+
+
+def to_array(img):
+    """Grey values of a slide as (height, width) array copy"""
+    img = img.convertToFormat(QImage.Format_Grayscale8)
+    ptr = img.constBits()
+    ptr.setsize(img.sizeInBytes())
+    rows = np.frombuffer(ptr, np.uint8).reshape(img.height(),
+                                                img.bytesPerLine())
+    return rows[:, :img.width()].copy()
+
+
+def to_image(grey):
+    """QImage using the pixels of a (height, width) array"""
+    return QImage(grey.data, grey.shape[1], grey.shape[0], grey.strides[0],
+                  QImage.Format_Grayscale8)
+
+
+def threshold(grey, level=200):
+    """Pixels brighter than level become white"""
+    return np.where(grey > level, np.uint8(255), grey)
+
+
+def invert(grey):
+    """Bright tracks on dark film and vice versa"""
+    return 255 - grey
+
+
+def background(grey, size=64):
+    """
+    Subtracts the background, estimated by scaling the slide down by size
+    and up again, keeping the mean brightness
+    """
+    height, width = grey.shape
+    img = to_image(grey)
+    bg = to_array(img.scaled(max(1, width//int(size)),
+                             max(1, height//int(size)),
+                             Qt.IgnoreAspectRatio, Qt.SmoothTransformation
+                             ).scaled(width, height, Qt.IgnoreAspectRatio,
+                                      Qt.SmoothTransformation))
+    flat = grey.astype(np.int16) - bg + int(bg.mean())
+    return np.clip(flat, 0, 255).astype(np.uint8)
+
+
+def stretch(grey, low=1, high=99):
+    """Stretches the grey values between the low and high percentile"""
+    cumulative = np.bincount(grey.ravel(), minlength=256).cumsum()
+    lo = np.searchsorted(cumulative, cumulative[-1]*low/100)
+    hi = max(np.searchsorted(cumulative, cumulative[-1]*high/100), lo + 1)
+    levels = (np.arange(256) - lo)*255/(hi - lo)
+    return np.clip(levels, 0, 255).round().astype(np.uint8)[grey]
+
+
+STEPS = {'threshold': threshold, 'invert': invert, 'background': background,
+         'stretch': stretch}
+
+
+def parse_pipeline(steps):
+    """'name:param:param' steps to (function, parameters)"""
+    pipeline = []
+    for step in steps:
+        name, *params = step.split(':')
+        if name not in STEPS:
+            raise ValueError(f'Unknown step {name}, valid: {list(STEPS)}')
+        pipeline.append((STEPS[name], [float(p) for p in params]))
+    return pipeline
+
+
+def find_slides(source, output, fmt=None, force=False):
+    """Lists (source, target) of the slides which have to be processed"""
+    todo = {}
+    for view_dir in sorted(os.listdir(source)):
+        if not view_dir.startswith('view_'):
+            continue
+        for img in sorted(os.listdir(os.path.join(source, view_dir))):
+            ImageNo, ext = os.path.splitext(img)
+            if not ImageNo.isdigit():
+                continue
+            src = os.path.join(source, view_dir, img)
+            dst = os.path.join(output, view_dir,
+                               ImageNo + ('.' + fmt if fmt else ext))
+            if dst in todo:
+                continue    # Same slide in several formats
+            if force or not os.path.isfile(dst) or (
+                    os.path.getmtime(dst) < os.path.getmtime(src)):
+                todo[dst] = src
+    return [(src, dst) for dst, src in todo.items()]
+
+
+def process(task):
+    """Worker: reads, processes and writes one slide"""
+    src, dst, steps, quality = task
+    img = QImage(src)
+    if img.isNull():
+        return src, None
+    grey = to_array(img)
+    for step, params in parse_pipeline(steps):
+        grey = step(grey, *params)
+    os.makedirs(os.path.dirname(dst), exist_ok=True)
+    tmp = dst + '.tmp'   # Not listed as slide until complete
+    if not to_image(grey).save(tmp, os.path.splitext(dst)[1][1:], quality):
+        return src, None
+    os.replace(tmp, dst)
+    return src, os.path.getsize(src)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument("-s", "--source",
+                        default='./images/Film 2411_2510/Default',
+                        help="Film type folder containing the view_x folders"
+                        )
+    parser.add_argument("-o", "--output", required=True,
+                        help="Name of the generated film type, created next "
+                        "to the source"
+                        )
+    parser.add_argument("-p", "--pipeline", nargs='+', required=True,
+                        help="Steps applied in order: threshold:LEVEL, "
+                        "invert, background:SIZE, stretch:LOW:HIGH"
+                        )
+    parser.add_argument("-f", "--format",
+                        help="Image format of the generated slides "
+                        "(default: format of the source)"
+                        )
+    parser.add_argument("-q", "--quality", type=int, default=-1,
+                        help="Quality 0-100 of the generated slides (png: "
+                        "90 or higher writes faster but larger files)"
+                        )
+    parser.add_argument("--force", action='store_true',
+                        help="Process all slides again, also overwriting a "
+                        "film type not generated by this tool"
+                        )
+    parser.add_argument("-j", "--jobs", type=int,
+                        default=os.cpu_count(),
+                        help="Number of processes"
+                        )
+    args = parser.parse_args()
+
+    try:
+        parse_pipeline(args.pipeline)
+    except ValueError as e:
+        parser.error(str(e))
+    source = os.path.normpath(args.source)
+    output = os.path.join(os.path.dirname(source), args.output)
+    if output == source:
+        parser.error('The output has to differ from the source film type')
+
+    # Slides of another pipeline are outdated and removed
+    description = (' '.join(args.pipeline) +
+                   f'\nformat {args.format} quality {args.quality}\n')
+    pipeline_file = os.path.join(output, PIPELINE_FILE)
+    force = args.force
+    if os.path.isfile(pipeline_file):
+        with open(pipeline_file) as f:
+            if f.read() != description:
+                print('Pipeline changed, processing all slides again')
+                force = True
+    elif os.path.isdir(output) and os.listdir(output) and not force:
+        parser.error(f'{output} was not generated by this tool, use --force '
+                     'to overwrite it')
+    if force and os.path.isdir(output):
+        for view_dir in os.listdir(output):
+            if view_dir.startswith('view_'):
+                shutil.rmtree(os.path.join(output, view_dir))
+    os.makedirs(output, exist_ok=True)
+    with open(pipeline_file, 'w') as f:
+        f.write(description)
+
+    todo = find_slides(source, output, args.format, force)
+    print(f'{len(todo)} slides to process into {output}')
+    start = time.time()
+    n_bytes = 0
+    with Pool(args.jobs) as pool:
+        for i, (src, size) in enumerate(pool.imap_unordered(
+                process, [(s, d, args.pipeline, args.quality)
+                          for s, d in todo],
+                chunksize=4)):
+            if size is None:
+                print('Unable to process', src)
+            else:
+                n_bytes += size
+            elapsed = max(time.time() - start, 1e-6)
+            print(f'{i+1}/{len(todo)}, {(i+1)/elapsed:.1f} slides/s, '
+                  f'{n_bytes/elapsed/1024/1024:.1f} MB/s', end='\r')
+    print(f'\nDone in {time.time()-start:.1f} s')
@@ -0,0 +1,81 @@
+"""
+Author: Divya Pal
+Institute: Physikalisches Institut, Universität Bonn
+Modified: Oct 2026
+Purpose: Records the inputs of the external controller as a trace, which can
+be replayed with main.py -sim TRACE to reproduce or benchmark a session
+without the controller.
+"""
+
+import time
+import argparse
+from configparser import ConfigParser
+from pyfirmata import Arduino, util, INPUT
+from packages.sim_board import write_trace
+
+
+def main():
+    """Records the controller inputs of the command line arguments"""
+    parser = argparse.ArgumentParser()
+    parser.add_argument("-p", "--port",
+                        help="Port connected to the external controller "
+                        "(default: port of the config file)"
+                        )
+    parser.add_argument("-cfg", "--config",
+                        default='./config_table1.ini',
+                        help="Config file defining the pins"
+                        )
+    parser.add_argument("-d", "--duration", type=float,
+                        default=60,
+                        help="Recording time in s"
+                        )
+    parser.add_argument("-o", "--output",
+                        default='input_trace.csv',
+                        help="File to write the trace to"
+                        )
+    args = parser.parse_args()
+
+    config = ConfigParser()
+    with open(args.config) as config_file:
+        config.read_file(config_file)
+    teensy = config['TeensyPins']
+
+    print('Connecting microcontroller')
+    board = Arduino(args.port or teensy['port'])
+    digital = [int(teensy[pin]) for pin in ('next_slide', 'previous_slide',
+                                            'view1', 'view2', 'view3',
+                                            'select_view')]
+    analog = [int(teensy[pin]) for pin in ('poti_x', 'poti_y', 'joy_x',
+                                           'joy_y')]
+    for pin in digital:
+        board.digital[pin].mode = INPUT
+    for pin in analog:
+        board.analog[pin].enable_reporting()
+    it = util.Iterator(board)
+    it.start()
+    time.sleep(1)
+
+    print(f'Recording for {args.duration} s')
+    trace = []
+    last = {}
+    start = time.perf_counter()
+    while time.perf_counter() - start < args.duration:
+        now = time.perf_counter() - start
+        for kind, pins, group in (('d', digital, board.digital),
+                                  ('a', analog, board.analog)):
+            for pin in pins:
+                value = group[pin].read()
+                if value is not None and value != last.get((kind, pin)):
+                    # The first values are the initial state at time 0
+                    t = round(now, 4) if (kind, pin) in last else 0
+                    last[(kind, pin)] = value
+                    trace.append((t, kind, pin, float(value)))
+        time.sleep(0.001)
+
+    board.exit()
+    write_trace(args.output, trace)
+    print(f'{len(trace)} changes written to {args.output}')
+
+
+if __name__ == '__main__':
+    main()
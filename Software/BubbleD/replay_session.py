@@ -0,0 +1,114 @@
+"""
+Author: Divya Pal
+Institute: Physikalisches Institut, Universität Bonn
+Modified: Oct 2026
+Purpose: Replays a session recorded with main.py -rec without displays (Qt
+offscreen platform), calling the same gui handlers at the recorded times or
+as fast as possible, and reports the time to handle each kind of action.
+The results are written like the ones of bench.py, so that a slow session
+from the lab can be compared between versions with bench.py -r/-c.
+"""
+
+import os
+import sys
+import json
+import time
+import argparse
+from collections import defaultdict
+from configparser import ConfigParser
+
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+from PyQt5.QtWidgets import QApplication  # noqa: E402
+from bench import summary, version  # noqa: E402
+from packages.session import read_session  # noqa: E402
+
+
+def wait(until):
+    """Handles the events (background loads, painting) until a time"""
+    while time.perf_counter() < until:
+        QApplication.processEvents()
+        time.sleep(min(0.001, max(until - time.perf_counter(), 0)))
+
+
+def replay(gui, actions, speed):
+    """
+    Replays the actions, at the recorded times divided by speed or without
+    waiting if speed is 0. Returns the handling times per action in ms.
+    """
+    times = defaultdict(list)
+    start = time.perf_counter()
+    for t, action, args, _ in actions:
+        if speed > 0:
+            wait(start + t/speed)
+        QApplication.processEvents()
+        begin = time.perf_counter()
+        gui.replay_action(action, args)
+        times[action].append((time.perf_counter() - begin)*1000)
+    wait(time.perf_counter() + 0.1)     # Last frame
+    return times
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument("session",
+                        help="Session file recorded with main.py -rec"
+                        )
+    parser.add_argument("-cfg", "--config",
+                        default='./config_table1.ini',
+                        help="Config file of the recorded table"
+                        )
+    parser.add_argument("-f", "--folder",
+                        help="Film folder replacing the recorded one"
+                        )
+    parser.add_argument("-s", "--speed", type=float,
+                        default=1.0,
+                        help="Replay speed, 0: as fast as possible"
+                        )
+    parser.add_argument("-o", "--output",
+                        default='replay.json',
+                        help="File to write the results to"
+                        )
+    args = parser.parse_args()
+
+    config = ConfigParser()
+    with open(args.config) as config_file:
+        config.read_file(config_file)
+    actions = read_session(args.session)
+    if args.folder:
+        config['Paths']['images'] = args.folder
+        actions = [(t, action, [args.folder] if action == 'folder' else a, ms)
+                   for t, action, a, ms in actions]
+
+    app = QApplication(sys.argv)
+    from packages.gui_control import GUIcontrol
+    gui = GUIcontrol(config)
+    gui.im_win.resize(*gui.proj_dim)
+    gui.im_win.show()
+    QApplication.processEvents()
+    print(f'Replaying {len(actions)} actions of {args.session}')
+    start = time.perf_counter()
+    times = replay(gui, actions, args.speed)
+    print(f'Done in {time.perf_counter()-start:.1f} s')
+    gui.close()
+
+    recorded = defaultdict(list)
+    for _, action, _, ms in actions:
+        if ms is not None:
+            recorded[action].append(ms)
+    results = {'version': version(),
+               'date': time.strftime('%Y-%m-%d %H:%M:%S'),
+               'session': args.session,
+               'speed': args.speed,
+               'results': {}}
+    print(f'{"action":<16}{"n":>6}{"median":>10}{"max":>10}{"recorded":>10}')
+    for action, ms in sorted(times.items()):
+        r = summary(ms)
+        r['max_ms'] = round(max(ms), 3)
+        results['results'][f'replay_{action}'] = r
+        lab = (f'{summary(recorded[action])["median_ms"]:10.2f}'
+               if recorded[action] else f'{"-":>10}')
+        print(f'{action:<16}{r["n"]:6}{r["median_ms"]:10.2f}'
+              f'{r["max_ms"]:10.2f}{lab}')
+    with open(args.output, 'w') as f:
+        json.dump(results, f, indent=1)
+    print('Results written to', args.output)
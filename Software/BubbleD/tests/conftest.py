@@ -0,0 +1,51 @@
+"""
+Author: Divya Pal
+Institute: Physikalisches Institut, Universität Bonn
+Modified: Oct 2026
+Purpose: Shared fixtures of the tests, which run without displays (Qt
+offscreen platform) on small generated films.
+"""
+
+import os
+import sys
+import pytest
+
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(
+    __file__))))
+from PyQt5.QtGui import QImage, QColor  # noqa: E402
+from PyQt5.QtWidgets import QApplication  # noqa: E402
+
+
+def make_film(film_folder, slides, FilmType='Default', missing=(),
+              ImgFormat='png'):
+    """
+    Film folder with three views of grey slides, except the (view, slide)
+    pairs in missing
+    """
+    for view in range(1, 4):
+        view_dir = os.path.join(film_folder, FilmType, f'view_{view}')
+        os.makedirs(view_dir, exist_ok=True)
+        for n in slides:
+            if (view, n) not in missing:
+                img = QImage(384, 216, QImage.Format_RGB32)
+                img.fill(QColor(200, 200, 200))
+                img.save(os.path.join(view_dir, f'{n}.{ImgFormat}'))
+    return str(film_folder)
+
+
+@pytest.fixture(scope='session')
+def app():
+    return QApplication.instance() or QApplication([])
+
+
+@pytest.fixture
+def config(tmp_path):
+    """Default configuration of table 1 with a small film"""
+    import packages.config_table1 as cfg
+    config = cfg.write_config(str(tmp_path / 'config_table1.ini'))
+    config['Paths']['images'] = make_film(tmp_path / 'Film 2411_2412',
+                                          (2411, 2412))
+    config['Paths']['prescaled'] = str(tmp_path / 'prescaled')
+    config['GUIParamters']['async_loading'] = 'False'
+    return config
@@ -0,0 +1,38 @@
+"""
+Author: Divya Pal
+Institute: Physikalisches Institut, Universität Bonn
+Modified: Oct 2026
+Purpose: Checks that the image sizes recorded in the manifest of a film
+folder are dropped when an image is overwritten in place.
+"""
+
+import os
+from multiprocessing.pool import ThreadPool
+from PyQt5.QtGui import QImage, QColor
+from conftest import make_film
+
+
+def test_overwritten_image(app, tmp_path):
+    from build_manifest import check_film
+    from packages.archive_index import ArchiveIndex
+    film = make_film(tmp_path / 'Film 2411_2412', (2411, 2412))
+    with ThreadPool(1) as pool:
+        assert check_film(pool, film, False) == (2 * 3, [])
+    assert ArchiveIndex(film).size('Default', 'png', 2411) == (384, 216)
+
+    # Overwriting the image doesn't change the modification time of its
+    # folder, which is restored to be sure
+    view_dir = os.path.join(film, 'Default', 'view_1')
+    path = os.path.join(view_dir, '2411.png')
+    folder_mtime = os.stat(view_dir).st_mtime_ns
+    img = QImage(100, 50, QImage.Format_RGB32)
+    img.fill(QColor(128, 128, 128))
+    assert img.save(path)
+    mtime = os.stat(path).st_mtime + 10
+    os.utime(path, (mtime, mtime))
+    os.utime(view_dir, ns=(folder_mtime, folder_mtime))
+
+    index = ArchiveIndex(film)
+    assert index.size('Default', 'png', 2411) is None
+    assert index.size('Default', 'png', 2412) == (384, 216)
+    assert ArchiveIndex(film).size('Default', 'png', 2411) is None
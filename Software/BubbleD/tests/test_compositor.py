@@ -0,0 +1,56 @@
+"""
+Author: Divya Pal
+Institute: Physikalisches Institut, Universität Bonn
+Modified: Oct 2026
+Purpose: Checks combining the views with a blend mode, including views with
+missing slides.
+"""
+
+import numpy as np
+from PyQt5.QtCore import QRect
+from PyQt5.QtGui import QImage, QColor
+from conftest import make_film
+
+
+def slide(grey):
+    img = QImage(4, 4, QImage.Format_ARGB32_Premultiplied)
+    img.fill(QColor(grey, grey, grey))
+    return img
+
+
+def test_darken(app):
+    from packages.compositor import Compositor, pixels
+    compositor = Compositor('darken')
+    compositor.setBackground(8, 4, (0, 0, 8, 4))
+    compositor.setViews([slide(200), slide(100)])
+    compositor.update(QRect(0, 0, 8, 4), [QRect(0, 0, 4, 4),
+                                          QRect(2, 0, 4, 4)])
+    out = pixels(compositor.image)[0, :, 0]
+    assert list(out) == [200, 200, 100, 100, 100, 100, 255, 255]
+
+
+def test_missing_slide(app):
+    from packages.compositor import Compositor, pixels
+    compositor = Compositor('darken')
+    compositor.setBackground(8, 4, (0, 0, 8, 4))
+    compositor.setViews([QImage(), slide(100)])
+    compositor.update(QRect(0, 0, 8, 4), [QRect(), QRect(2, 0, 4, 4)])
+    out = pixels(compositor.image)[0, :, 0]
+    assert list(out) == [255, 255, 100, 100, 100, 100, 255, 255]
+
+
+def test_missing_view_projected(app, tmp_path):
+    from packages.image_window import ImageWindow
+    film = make_film(tmp_path / 'Film 2411_2412', (2411, 2412),
+                     missing=[(2, 2412)])
+    win = ImageWindow('icon.png', blend_mode='darken')
+    try:
+        win.resize(800, 600)
+        win.show()
+        win.selectImage(img_folder=film, View=np.array([1, 1, 0]),
+                        ImageNo=2412, dx=np.zeros(3), dy=np.zeros(3),
+                        tx=0, ty=0, tw=384, th=216)
+        assert win.layers[0] is not None and win.layers[1] is None
+        win.repaint()
+    finally:
+        win.shutdown()
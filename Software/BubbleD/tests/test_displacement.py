@@ -0,0 +1,102 @@
+"""
+Author: Divya Pal
+Institute: Physikalisches Institut, Universität Bonn
+Modified: Oct 2026
+Purpose: Checks without displays (Qt offscreen platform) that every user
+action moving a view, from the spin boxes, the slidders or one input cycle
+of the (simulated) controller, notifies the displacement model once and is
+painted in one frame.
+"""
+
+import time
+import pytest
+from PyQt5.QtWidgets import QApplication
+
+
+def wait_frame(gui, timeout=1.0):
+    """Handles the events until the pending frame was painted"""
+    scheduler = gui.im_win.scheduler
+    end = time.perf_counter() + timeout
+    QApplication.processEvents()
+    while scheduler.timer.isActive() and time.perf_counter() < end:
+        QApplication.processEvents()
+        time.sleep(0.001)
+    assert not scheduler.timer.isActive()
+
+
+def counts(gui):
+    """(notifications, requested repaints, painted frames) so far"""
+    scheduler = gui.im_win.scheduler
+    return (gui.displacement.notifications, scheduler.requests,
+            scheduler.frames)
+
+
+def projected(gui):
+    """Shows the projection with the first view"""
+    gui.im_win.resize(*gui.proj_dim)
+    gui.im_win.show()
+    QApplication.processEvents()
+    if not gui.btn_PV[0].isChecked():
+        gui.btn_PV[0].click()
+    wait_frame(gui)
+    return gui
+
+
+@pytest.fixture
+def gui(app, config):
+    from packages.gui_control import GUIcontrol
+    gui = projected(GUIcontrol(config))
+    yield gui
+    gui.im_win.shutdown()
+    gui.im_win.close()
+    gui.close()
+
+
+@pytest.mark.parametrize('widgets', ['sbx_x', 'hsl_x', 'sbx_y', 'hsl_y'])
+def test_widget_action(gui, widgets):
+    widget = getattr(gui, widgets)[0]
+    before = counts(gui)
+    widget.setValue(widget.value() + 5)
+    wait_frame(gui)
+    assert [a - b for a, b in zip(counts(gui), before)] == [1, 1, 1]
+
+    # The other widgets show the model without notifying it again
+    axis = widgets[-1]
+    value = getattr(gui.displacement, 'd' + axis)[0]
+    assert getattr(gui, 'sbx_' + axis)[0].value() == value
+    assert getattr(gui, 'hsl_' + axis)[0].value() == value
+    assert counts(gui)[0] == before[0] + 1
+
+
+def test_controller_batch(app, config):
+    from packages.io_control import IOcontrol
+    pins = config['TeensyPins']
+    joy_x, joy_y = int(pins['joy_x']), int(pins['joy_y'])
+    poti_x, poti_y = int(pins['poti_x']), int(pins['poti_y'])
+    trace = [(0, 'a', joy_x, 0.5), (0, 'a', joy_y, 0.5),
+             (0, 'a', poti_x, 0.5), (0, 'a', poti_y, 0.5),
+             (0, 'd', int(pins['view1']), 1)]
+    io = IOcontrol(None, config, trace)
+    io.timerFast.stop()     # The input cycles are run by the test
+    try:
+        io.updateInput()    # Initial state, projecting the first view
+        gui = projected(io.control)
+        io.updateInput()
+        wait_frame(gui)
+        dx, dy = gui.displacement.dx[0], gui.displacement.dy[0]
+
+        # Joystick and potentiometers moved in both directions in one cycle
+        before = counts(gui)
+        for pin, value in ((joy_x, 0.9), (joy_y, 0.9), (poti_x, 0.6),
+                           (poti_y, 0.6)):
+            io.board.apply('a', pin, value)
+        io.updateInput()
+        wait_frame(gui)
+        assert gui.displacement.dx[0] != dx
+        assert gui.displacement.dy[0] != dy
+        assert [a - b for a, b in zip(counts(gui), before)] == [1, 1, 1]
+    finally:
+        io.control.im_win.shutdown()
+        io.control.im_win.close()
+        io.control.close()
+        io.close()
@@ -0,0 +1,54 @@
+"""
+Author: Divya Pal
+Institute: Physikalisches Institut, Universität Bonn
+Modified: Oct 2026
+Purpose: Checks loading the slides of the projection in the background.
+"""
+
+import time
+import numpy as np
+import pytest
+from PyQt5.QtWidgets import QApplication
+from conftest import make_film
+
+
+@pytest.fixture
+def win(app):
+    from packages.image_window import ImageWindow
+    win = ImageWindow('icon.png', async_load=True)
+    yield win
+    win.shutdown()
+
+
+def select(win, film, ImageNo):
+    win.selectImage(img_folder=film, View=np.array([1, 1, 0]),
+                    ImageNo=ImageNo, dx=np.zeros(3), dy=np.zeros(3), tx=0,
+                    ty=0, tw=384, th=216)
+    end = time.perf_counter() + 5
+    while not win.keys or win.keys[0][3] != ImageNo:
+        assert time.perf_counter() < end, 'Slide not projected'
+        QApplication.processEvents()
+        time.sleep(0.001)
+
+
+def test_background_load(win, tmp_path):
+    film = make_film(tmp_path / 'Film 2411_2412', (2411, 2412))
+    select(win, film, 2411)
+    select(win, film, 2412)
+    assert all(layer is not None for layer in win.layers[:2])
+
+
+def test_load_error(win, tmp_path):
+    film = make_film(tmp_path / 'Film 2411_2412', (2411, 2412))
+    errors = []
+    win.loadFailed.connect(lambda *error: errors.append(error))
+    load = win.prefetcher.load
+
+    def failing(key):
+        if key[2] == 2:
+            raise OSError('disk failure')
+        return load(key)
+    win.prefetcher.load = failing
+    select(win, film, 2412)     # Projected without the failed view
+    assert win.layers[0] is not None and win.layers[1] is None
+    assert len(errors) == 1 and 'disk failure' in errors[0][1]
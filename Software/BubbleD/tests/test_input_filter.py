@@ -0,0 +1,62 @@
+"""
+Author: Divya Pal
+Institute: Physikalisches Institut, Universität Bonn
+Modified: Oct 2026
+Purpose: Checks the filter of the analog inputs with timestamped samples of
+the joystick: the deadband of its centre zone and its release, and the
+integration of the displacement once per frame.
+"""
+
+from packages.input_filter import AnalogFilter
+
+FRAME = 0.016
+
+InputPanel = {'filter_tau_ms': '0', 'filter_frame_ms': str(FRAME*1000),
+              'joy_midx': '0.5', 'joy_midy': '0.5',
+              'joy_tolx': '0.1', 'joy_toly': '0.1',
+              'joy_polx': '+', 'joy_poly': '+',
+              'joy_stepx': '10', 'joy_stepy': '10',
+              'poti_tolx': '0.02', 'poti_toly': '0.02',
+              'poti_polx': '+', 'poti_poly': '+',
+              'poti_stepx': '1', 'poti_stepy': '1'}
+
+
+def run(joy_x, frames, start=0):
+    """Adds one sample of joystick x per frame, returns the displacements"""
+    f = AnalogFilter(InputPanel)
+    moves = []
+    for i in range(frames):
+        t = start + i*FRAME
+        f.add(t, [joy_x(i), 0.5, 0, 0])
+        moves.append(f.displacement(t))
+    return moves
+
+
+def test_centre_zone():
+    moves = run(lambda i: 0.5 + (0.09 if i % 2 else -0.09), 20)
+    assert moves[0] is None     # The first frame only primes the filter
+    assert set(moves[1:]) == {(0, 0)}
+
+
+def test_release():
+    x = [0.5 - 0.04*i for i in range(11)] + [0.06 + 0.04*i for i in range(12)]
+    moves = run(lambda i: x[i], len(x))
+    pushed = sum(dx for dx, dy in moves[1:11])
+    assert pushed > 0
+    assert set(moves[11:]) == {(0, 0)}
+
+
+def test_one_step_per_frame():
+    f = AnalogFilter(InputPanel)
+    total = []
+    for i in range(12):
+        t = i*FRAME
+        f.add(t, [0.35 - 0.03*i, 0.5, 0, 0])
+        total.append(f.displacement(t))
+        # Further samples within the frame are kept for the next frame
+        f.add(t + FRAME/2, [0.35 - 0.03*(i + 0.5), 0.5, 0, 0])
+        assert f.displacement(t + FRAME/2) is None
+    # 0.3 pixels per frame, the fractions are accumulated
+    assert total[0] is None
+    assert all(move in ((0, 0), (1, 0)) for move in total[1:])
+    assert sum(dx for dx, dy in total[1:]) == 3
@@ -0,0 +1,27 @@
+"""
+Author: Divya Pal
+Institute: Physikalisches Institut, Universität Bonn
+Modified: Oct 2026
+Purpose: Checks the slides pre-scaled by prescale.py.
+"""
+
+import os
+import numpy as np
+from PyQt5.QtGui import QImage
+
+
+def test_lossless(app, tmp_path):
+    """A pre-scaled jpg slide is loaded like the scaled original"""
+    from prescale import scale_slide
+    from packages.slide_cache import prescaled_path, load_slide
+    from packages.compositor import pixels
+    noise = np.random.default_rng(1).integers(0, 256, (400, 600),
+                                              dtype=np.uint8)
+    src = str(tmp_path / '2411.jpg')
+    QImage(noise.data, 600, 400, 600, QImage.Format_Grayscale8).save(src)
+    dst = prescaled_path(str(tmp_path / 'prescaled'), str(tmp_path),
+                         'Default', 1, 2411, 'jpg', 200, 300)
+    assert scale_slide((src, dst, 200, 300)) == (src, True)
+    assert os.path.isfile(dst) and dst.endswith('.png')
+    assert (pixels(load_slide(src, 200, 300, dst)) ==
+            pixels(load_slide(src, 200, 300))).all()
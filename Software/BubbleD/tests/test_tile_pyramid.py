@@ -0,0 +1,39 @@
+"""
+Author: Divya Pal
+Institute: Physikalisches Institut, Universität Bonn
+Modified: Oct 2026
+Purpose: Checks the tile pyramids used for zooming into the projection.
+"""
+
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from PyQt5.QtGui import QImage, QColor
+
+
+def test_image_formats(app, tmp_path):
+    """Slides of the same number in two formats have their own pyramid"""
+    from packages.tile_pyramid import TileStore
+    film = str(tmp_path / 'Film 2411_2412')
+    view_dir = os.path.join(film, 'Default', 'view_1')
+    os.makedirs(view_dir)
+    for ImgFormat, grey in (('png', 50), ('jpg', 200)):
+        img = QImage(600, 400, QImage.Format_RGB32)
+        img.fill(QColor(grey, grey, grey))
+        img.save(os.path.join(view_dir, f'2411.{ImgFormat}'))
+
+    pool = ThreadPoolExecutor(1)
+    tiles = TileStore(str(tmp_path / 'prescaled'), pool, tile=256)
+    greys = {}
+    for ImgFormat in ('png', 'jpg'):
+        key = (film, 'Default', 1, 2411, ImgFormat, 400, 600)
+        end = time.perf_counter() + 5
+        pyramid = tiles.pyramid(key)
+        while pyramid is None:
+            assert time.perf_counter() < end, 'Pyramid not built'
+            time.sleep(0.01)
+            pyramid = tiles.pyramid(key)
+        greys[ImgFormat] = QColor(tiles.image(pyramid, 0, 0, 0).pixel(
+            10, 10)).red()
+    pool.shutdown()
+    assert abs(greys['png'] - 50) <= 2 and abs(greys['jpg'] - 200) <= 2
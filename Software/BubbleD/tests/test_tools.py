@@ -0,0 +1,35 @@
+"""
+Author: Divya Pal
+Institute: Physikalisches Institut, Universität Bonn
+Modified: Oct 2026
+Purpose: Checks that the tools processing all slides (prescale.py,
+pack_films.py, build_tiles.py) find the same slides as the gui.
+"""
+
+import os
+from conftest import make_film
+
+
+def test_find_slides(app, tmp_path):
+    from packages.archive_index import ArchiveIndex, MANIFEST
+    film = make_film(tmp_path / 'images' / 'Film 2411_2412', (2411, 2412))
+    make_film(film, (2411,), ImgFormat='jpg')
+    ArchiveIndex(film)      # Writes the manifest into the film folder
+    assert os.path.isfile(os.path.join(film, MANIFEST))
+    open(os.path.join(film, 'Default', 'view_1', 'notes.txt'), 'w').close()
+
+    import prescale
+    import pack_films
+    import build_tiles
+    images, out = str(tmp_path / 'images'), str(tmp_path / 'prescaled')
+    slides = prescale.find_slides(images, out, 100, 100)
+    assert len(slides) == 3*3
+    assert sorted(os.path.basename(src) for src, _ in slides[:3]) == [
+        '2411.jpg', '2411.png', '2412.png']
+    assert len({dst for _, dst in slides}) == len(slides)
+    assert [src for src, _ in build_tiles.find_slides(images, out)] == [
+        src for src, _ in slides]
+    views = pack_films.find_views(images, out, 100, 100)
+    assert [(view, slides) for _, _, view, slides, _ in views] == [
+        (view, [(2411, 'jpg'), (2411, 'png'), (2412, 'png')])
+        for view in (1, 2, 3)]
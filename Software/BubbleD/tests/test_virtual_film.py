@@ -0,0 +1,46 @@
+"""
+Author: Divya Pal
+Institute: Physikalisches Institut, Universität Bonn
+Modified: Oct 2026
+Purpose: Checks the virtual film types computed from the slides of another
+film type, including views with missing slides.
+"""
+
+import numpy as np
+from PyQt5.QtGui import QImage, QColor
+from conftest import make_film
+
+
+def test_opacity(app):
+    img = QImage(4, 2, QImage.Format_ARGB32_Premultiplied)
+    img.fill(QColor(255, 255, 255))
+    for x in range(4):
+        img.setPixelColor(x, 1, QColor(20, 20, 20))   # Track
+    from packages.virtual_film import VirtualFilmType
+    out = VirtualFilmType('Default', 128, 40).apply(img)
+    assert [QColor.fromRgba(out.pixel(0, y)).alpha() for y in (0, 1)] == [
+        40, 255]
+
+
+def test_missing_base_slide(app):
+    from packages.virtual_film import VirtualFilmType
+    assert VirtualFilmType('Default', 128, 40).apply(QImage()).isNull()
+
+
+def test_missing_view_projected(app, tmp_path):
+    from packages.image_window import ImageWindow
+    from packages.virtual_film import VirtualFilmType
+    film = make_film(tmp_path / 'Film 2411_2412', (2411, 2412),
+                     missing=[(2, 2412)])
+    win = ImageWindow('icon.png', virtual={
+        'transparent_128': VirtualFilmType('Default', 128, 40)})
+    try:
+        win.selectImage(img_folder=film, View=np.array([1, 1, 0]),
+                        FilmType='transparent_128', ImageNo=2412,
+                        dx=np.zeros(3), dy=np.zeros(3), tx=0, ty=0,
+                        tw=384, th=216)
+        assert not win.sc_img[0].isNull()
+        assert win.sc_img[1].isNull()
+        win.repaint()
+    finally:
+        win.shutdown()